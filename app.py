@@ -1,5 +1,17 @@
+# Started before the other imports so the startup report includes them.
+from startup import start_timer, render_startup_report
+startup_timer = start_timer("app.py")
+
+import math
 import streamlit as st
-import pandas as pd
+from datetime import datetime, timedelta
+from stomp.bulk_io import iter_import_chunks, running_totals, validate_chunk, export_bytes
+from stomp.db import get_database
+from stomp.store import TEAM_NAMES, PLAYER, PENALTY
+from utils.cache import content_hash
+from utils.tracing import begin_rerun, render_debug_panel, span, traced
+
+PAGE_SIZES = [25, 50, 100, 250]
 
 def set_page_style():
     """Set custom page styling."""
@@ -95,16 +107,65 @@ def set_page_style():
         <div class="blooming-flower">✿</div>
     """, unsafe_allow_html=True)
 
+@traced()
 def initialize_session_state():
     """Initialize session state variables."""
-    if 'team1_players' not in st.session_state:
-        st.session_state.team1_players = []
-    if 'team2_players' not in st.session_state:
-        st.session_state.team2_players = []
-    if 'team1_penalties' not in st.session_state:
-        st.session_state.team1_penalties = []
-    if 'team2_penalties' not in st.session_state:
-        st.session_state.team2_penalties = []
+    game = st.query_params.get("game", "default")
+    if st.session_state.get('game') != game:
+        st.session_state.game = game
+        st.session_state.entries, st.session_state.game_rev = get_database().state_at(game)
+        st.session_state.undo_stack = []
+        st.session_state.redo_stack = []
+    sync_game()
+
+@traced()
+def sync_game():
+    """Pull entries added or deleted (by any session) since the last sync."""
+    changes = get_database().changes_since(st.session_state.game, st.session_state.game_rev)
+    st.session_state.game_rev = st.session_state.entries.apply_changes(changes, st.session_state.game_rev)
+
+def record_action(action, entry_ids):
+    """Push an add/delete action onto this session's undo stack."""
+    if entry_ids:
+        st.session_state.undo_stack.append((action, entry_ids))
+        st.session_state.redo_stack.clear()
+
+def replay_action(action, entry_ids, undo):
+    """Undo or redo an action and return the ids it actually changed.
+
+    Another session may have deleted or restored some of the entries in
+    the meantime; only the ids changed here can be undone again.
+    """
+    database = get_database()
+    if (action == "add") == undo:
+        return database.delete_entries(st.session_state.game, entry_ids)
+    return database.restore_entries(st.session_state.game, entry_ids)
+
+def render_history_controls():
+    """Render undo/redo buttons for this session's own adds and deletes."""
+    col1, col2 = st.sidebar.columns(2)
+    with col1:
+        if st.button("Undo", key="undo", disabled=not st.session_state.undo_stack):
+            action, entry_ids = st.session_state.undo_stack.pop()
+            changed = replay_action(action, entry_ids, undo=True)
+            if changed:
+                st.session_state.redo_stack.append((action, changed))
+            st.rerun()
+    with col2:
+        if st.button("Redo", key="redo", disabled=not st.session_state.redo_stack):
+            action, entry_ids = st.session_state.redo_stack.pop()
+            changed = replay_action(action, entry_ids, undo=False)
+            if changed:
+                st.session_state.undo_stack.append((action, changed))
+            st.rerun()
+
+def render_game_picker():
+    """Render the shared game selector in the sidebar."""
+    game = st.sidebar.text_input("Game", value=st.session_state.game)
+    if game and game != st.session_state.game:
+        st.query_params["game"] = game
+        st.rerun()
+    st.sidebar.number_input("Top players shown", min_value=1, max_value=50, value=3, key="top_k")
 
 def render_header():
     """Render the application header."""
@@ -118,6 +179,7 @@ def render_header():
     st.markdown('<div class="divider">﹒ʬʬ﹒⪩⪨﹒⟡﹒ᐢ..ᐢ</div>', unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
+@traced()
 def render_player_input():
     """Render the player input section."""
     st.markdown('<div class="section-title">Add Player Stats</div>', unsafe_allow_html=True)
@@ -136,22 +198,17 @@ def render_player_input():
 
     if st.button("Add Player"):
         if player_name and score_after >= score_before:
-            new_player = {
-                "Name": player_name,
-                "Score Before": score_before,
-                "Score After": score_after,
-                "Difference": score_after - score_before
-            }
-            if team == "Team 1":
-                st.session_state.team1_players.append(new_player)
-            else:
-                st.session_state.team2_players.append(new_player)
+            record_action("add", get_database().add_entries(st.session_state.game, [
+                (TEAM_NAMES.index(team), PLAYER, player_name, score_before, score_after, score_after - score_before)
+            ]))
+            sync_game()
             st.success(f"Added {player_name}'s stats!")
         else:
             st.error("Please enter valid player information.")
 
     st.markdown('<div class="divider">﹒✿﹒⊹﹒∇﹒✸</div>', unsafe_allow_html=True)
 
+@traced()
 def render_penalty_input():
     """Render the penalty input section."""
     st.markdown('<div class="section-title">Add Penalty</div>', unsafe_allow_html=True)
@@ -168,90 +225,122 @@ def render_penalty_input():
 
     if st.button("Add Penalty"):
         if penalty_name and penalty_amount > 0:
-            new_penalty = {
-                "Name": penalty_name,
-                "Score Before": "N/A",
-                "Score After": "N/A",
-                "Difference": -penalty_amount
-            }
-            if team == "Team 1":
-                st.session_state.team1_penalties.append(new_penalty)
-            else:
-                st.session_state.team2_penalties.append(new_penalty)
+            record_action("add", get_database().add_entries(st.session_state.game, [
+                (TEAM_NAMES.index(team), PENALTY, penalty_name, 0, 0, -penalty_amount)
+            ]))
+            sync_game()
             st.success(f"Added penalty to {team}")
         else:
             st.error("Please enter valid penalty information.")
 
     st.markdown('<div class="divider">﹒⟢﹒❀﹒ᵔᴗᵔ﹒♡</div>', unsafe_allow_html=True)
 
+@traced()
+def render_bulk_io():
+    """Render the bulk import and export section."""
+    st.markdown('<div class="section-title">Import / Export</div>', unsafe_allow_html=True)
+    st.markdown('<div class="divider">⟡ ✿ ⟡</div>', unsafe_allow_html=True)
+
+    upload = st.file_uploader("Import player stats (CSV or Parquet)", type=["csv", "parquet"])
+    if upload is not None and st.button("Import"):
+        imported_ids = []
+        rejected = 0
+        totals = running_totals()
+        try:
+            for chunk in iter_import_chunks(upload, upload.name):
+                rows, chunk_rejected = validate_chunk(chunk, totals)
+                imported_ids.extend(get_database().add_entries(st.session_state.game, rows))
+                rejected += chunk_rejected
+        except ValueError as e:
+            st.error(f"Import failed: {str(e)}")
+        record_action("add", imported_ids)
+        imported = len(imported_ids)
+        sync_game()
+        if imported:
+            st.success(f"Imported {imported} rows ({rejected} rejected)")
+        elif rejected:
+            st.error(f"No valid rows found ({rejected} rejected)")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        export_format = st.selectbox("Export Format", ["CSV", "Parquet"])
+    with col2:
+        if st.button("Prepare Export"):
+            try:
+                st.session_state.export_data = export_bytes(st.session_state.entries, export_format)
+                st.session_state.export_format = export_format
+            except ImportError:
+                st.error("Parquet export requires the pyarrow package")
+    if st.session_state.get('export_data') is not None:
+        extension = "parquet" if st.session_state.export_format == "Parquet" else "csv"
+        st.download_button(
+            f"Download {st.session_state.export_format}",
+            st.session_state.export_data,
+            file_name=f"{st.session_state.game}.{extension}",
+        )
+
+    st.markdown('<div class="divider">﹒✿﹒⊹﹒∇﹒✸</div>', unsafe_allow_html=True)
+
+@traced()
 def render_team_statistics():
-    """Render team statistics."""
-    if st.session_state.team1_players:
-        st.markdown('<div class="section-title">Team 1</div>', unsafe_allow_html=True)
+    """Render team statistics, one page of rows at a time."""
+    entries = st.session_state.entries
+    for team, team_name in enumerate(TEAM_NAMES):
+        if not entries.aggregate(team).player_count:
+            continue
+        st.markdown(f'<div class="section-title">{team_name}</div>', unsafe_allow_html=True)
         st.markdown('<div class="divider">⟡ ✿ ⟡</div>', unsafe_allow_html=True)
-        team1_data = st.session_state.team1_players + st.session_state.team1_penalties
-        if team1_data:
-            team1_total = (
-                sum(p['Difference'] for p in st.session_state.team1_players) +
-                sum(p['Difference'] for p in st.session_state.team1_penalties)
-            )
-            total_row = [{
-                'Name': 'TOTAL',
-                'Score Before': sum(p['Score Before'] for p in st.session_state.team1_players if isinstance(p['Score Before'], (int, float))),
-                'Score After': sum(p['Score After'] for p in st.session_state.team1_players if isinstance(p['Score After'], (int, float))),
-                'Difference': team1_total
-            }]
-            team1_df = pd.DataFrame(team1_data + total_row)
-            st.dataframe(team1_df, hide_index=True, use_container_width=True)
-
-            for idx, item in enumerate(team1_data):
-                if st.button(f"Delete {item['Name']}", key=f"delete_team1_{idx}"):
-                    if item in st.session_state.team1_players:
-                        st.session_state.team1_players.remove(item)
-                    else:
-                        st.session_state.team1_penalties.remove(item)
-                    st.rerun()
-
-    if st.session_state.team2_players:
-        st.markdown('<div class="section-title">Team 2</div>', unsafe_allow_html=True)
-        st.markdown('<div class="divider">⟡ ✿ ⟡</div>', unsafe_allow_html=True)
-        team2_data = st.session_state.team2_players + st.session_state.team2_penalties
-        if team2_data:
-            team2_total = (
-                sum(p['Difference'] for p in st.session_state.team2_players) +
-                sum(p['Difference'] for p in st.session_state.team2_penalties)
-            )
-            total_row = [{
-                'Name': 'TOTAL',
-                'Score Before': sum(p['Score Before'] for p in st.session_state.team2_players if isinstance(p['Score Before'], (int, float))),
-                'Score After': sum(p['Score After'] for p in st.session_state.team2_players if isinstance(p['Score After'], (int, float))),
-                'Difference': team2_total
-            }]
-            team2_df = pd.DataFrame(team2_data + total_row)
-            st.dataframe(team2_df, hide_index=True, use_container_width=True)
-
-            for idx, item in enumerate(team2_data):
-                if st.button(f"Delete {item['Name']}", key=f"delete_team2_{idx}"):
-                    if item in st.session_state.team2_players:
-                        st.session_state.team2_players.remove(item)
-                    else:
-                        st.session_state.team2_penalties.remove(item)
-                    st.rerun()
+        rows = entries.team_rows(team)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"page_size_team{team + 1}")
+        page_count = max(1, -(-len(rows) // page_size))
+        page_key = f"page_team{team + 1}"
+        # The page lives only in session state (no value=), so clamping it
+        # here doesn't conflict with a widget default.
+        st.session_state[page_key] = min(st.session_state.get(page_key, 1), page_count)
+        with col2:
+            page = st.number_input("Page", min_value=1, max_value=page_count, key=page_key)
+        st.caption(f"{len(rows)} entries, page {page} of {page_count}")
+
+        visible = rows[(page - 1) * page_size:page * page_size]
+        visible_ids = entries.entry_id[visible]
+        with span("EntryStore.team_frame"):
+            frame = entries.team_frame(team, visible, with_total=False)
+        table = st.dataframe(
+            frame,
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="multi-row",
+            # Selections are positional and Streamlit keeps them across data
+            # changes, so the key follows the entries shown: when a delete,
+            # an add or another scorekeeper's sync shifts the rows, the stale
+            # selection is dropped instead of pointing at different entries.
+            key=f"table_team{team + 1}_{content_hash(visible_ids)}",
+        )
+        with span("EntryStore.total_frame"):
+            total = entries.total_frame(team)
+        st.dataframe(total, hide_index=True, use_container_width=True)
+
+        selected = [row for row in table.selection.rows if row < len(visible_ids)]
+        if st.button(f"Delete selected ({len(selected)})", key=f"delete_team{team + 1}", disabled=not selected):
+            entry_ids = visible_ids[selected].tolist()
+            record_action("delete", get_database().delete_entries(st.session_state.game, entry_ids))
+            st.rerun()
 
+@traced()
 def render_summary():
     """Render the summary section with winning team and overview."""
-    if st.session_state.team1_players or st.session_state.team2_players:
+    entries = st.session_state.entries
+    team1_aggregate, team2_aggregate = entries.aggregates
+    if team1_aggregate.player_count or team2_aggregate.player_count:
         st.markdown("---")
         st.markdown('<div class="divider">﹒⟢﹒❀﹒ᵔᴗᵔ﹒♡﹒〇﹒ıllı</div>', unsafe_allow_html=True)
 
-        team1_total = (
-            sum(p['Difference'] for p in st.session_state.team1_players) +
-            sum(p['Difference'] for p in st.session_state.team1_penalties)
-        )
-        team2_total = (
-            sum(p['Difference'] for p in st.session_state.team2_players) +
-            sum(p['Difference'] for p in st.session_state.team2_penalties)
-        )
+        team1_total = team1_aggregate.total
+        team2_total = team2_aggregate.total
 
         st.write("winning team:")
         if team1_total > team2_total:
@@ -262,40 +351,66 @@ def render_summary():
             st.write("Tie!")
 
         st.write("OVERVIEW")
-
-        st.write("Team 1:")
-        st.write(f"total stomps: {team1_total}")
-        if st.session_state.team1_players:
-            st.write("top 3 players:")
-            top_players = sorted(
-                [p for p in st.session_state.team1_players if isinstance(p['Difference'], (int, float))],
-                key=lambda x: x['Difference'],
-                reverse=True
-            )[:3]
-            for player in top_players:
-                st.write(f"{player['Name']} | {player['Difference']}")
-
-        st.write("Team 2:")
-        st.write(f"total stomps: {team2_total}")
-        if st.session_state.team2_players:
-            st.write("top 3 players:")
-            top_players = sorted(
-                [p for p in st.session_state.team2_players if isinstance(p['Difference'], (int, float))],
-                key=lambda x: x['Difference'],
-                reverse=True
-            )[:3]
-            for player in top_players:
-                st.write(f"{player['Name']} | {player['Difference']}")
+        top_k = st.session_state.get('top_k', 3)
+
+        for team, team_name in enumerate(TEAM_NAMES):
+            aggregate = entries.aggregate(team)
+            st.write(f"{team_name}:")
+            st.write(f"total stomps: {aggregate.total}")
+            if aggregate.player_count:
+                st.write(f"top {top_k} players:")
+                for entry_id, difference in entries.top_players(team, top_k):
+                    st.write(f"{entries.entry_name(entry_id)} | {difference}")
+
+        st.write("Overall:")
+        st.write(f"top {top_k} players:")
+        for team, entry_id, difference in entries.overall_top_players(top_k):
+            st.write(f"{entries.entry_name(entry_id)} ({TEAM_NAMES[team]}) | {difference}")
+
+        render_score_at_time()
+
+@traced()
+def render_score_at_time():
+    """Render team totals as of a chosen moment, rebuilt from the event log."""
+    time_range = get_database().event_time_range(st.session_state.game)
+    if time_range is None:
+        return
+    start = datetime.fromtimestamp(math.floor(time_range[0]))
+    end = datetime.fromtimestamp(math.ceil(time_range[1]))
+    if start >= end:
+        return
+    with st.expander("Score at time"):
+        moment = st.slider(
+            "Time", min_value=start, max_value=end, value=end,
+            step=timedelta(seconds=1), format="YYYY-MM-DD HH:mm:ss",
+        )
+        if moment >= end:
+            past, seq = st.session_state.entries, st.session_state.game_rev
+        else:
+            seq = get_database().seq_at_time(st.session_state.game, moment.timestamp())
+            past, seq = get_database().state_at(st.session_state.game, seq)
+        totals = " | ".join(
+            f"{team_name}: {past.aggregate(team).total}" for team, team_name in enumerate(TEAM_NAMES)
+        )
+        st.write(f"{totals} (after {seq} events)")
 
 def main():
     """Main application function."""
-    set_page_style()
-    initialize_session_state()
-    render_header()
-    render_player_input()
-    render_penalty_input()
-    render_team_statistics()
-    render_summary()
+    with begin_rerun("app.py") as recorder:
+        set_page_style()
+        initialize_session_state()
+        render_game_picker()
+        render_history_controls()
+        render_header()
+        startup_timer.mark("first paint (header)")
+        render_player_input()
+        render_penalty_input()
+        render_bulk_io()
+        render_team_statistics()
+        render_summary()
+        startup_timer.mark("page rendered")
+        render_startup_report(startup_timer)
+        render_debug_panel(recorder)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
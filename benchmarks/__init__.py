@@ -0,0 +1 @@
+"""Benchmark harness for the chart maker and stomp counter (see benchmarks/run.py)."""
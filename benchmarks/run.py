@@ -0,0 +1,196 @@
+"""Benchmarks for the chart maker's parsing, operations, statistics and charts
+and the stomp counter's team aggregation, run outside Streamlit.
+
+    python -m benchmarks.run                          # every case, sizes 10 .. 10**8
+    python -m benchmarks.run --max-size 1000000 --only chart
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+Each case is warmed up once, timed over --repeat runs (best time kept),
+then run once more under tracemalloc for its peak allocation, which NumPy
+buffers are counted in. Chart cases also record the size of the figure's
+JSON. --compare reports the ratio against a saved baseline and exits with
+status 1 when any case got slower than the tolerance allows.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import numpy as np
+
+SIZES = [10, 10**3, 10**5, 10**6, 10**7, 10**8]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[int], Any]  # size -> input, built outside the measurement
+    run: Callable[[Any], Any]
+    max_size: int = SIZES[-1]  # larger inputs would only measure list/str materialization
+    figure: bool = False
+
+def _random(size: int) -> np.ndarray:
+    return np.random.default_rng(0).standard_normal(size)
+
+def _strings(size: int) -> List[str]:
+    return [repr(value) for value in _random(size).tolist()]
+
+def _store_columns(size: int) -> tuple:
+    rng = np.random.default_rng(0)
+    before = rng.integers(0, 100, size)
+    return (
+        np.arange(1, size + 1), rng.integers(0, 2, size), np.zeros(size, dtype=np.int8),
+        np.array([f"player {i % 1000}" for i in range(size)], dtype=object),
+        before, before + rng.integers(0, 50, size),
+    )
+
+def _filled_store(size: int):
+    from stomp.store import EntryStore
+    store = EntryStore()
+    entry_ids, team, kind, name, before, after = _store_columns(size)
+    store.extend(entry_ids, team, kind, name, before, after, after - before)
+    return store
+
+def _extend(columns: tuple):
+    from stomp.store import EntryStore
+    entry_ids, team, kind, name, before, after = columns
+    store = EntryStore()
+    store.extend(entry_ids, team, kind, name, before, after, after - before)
+    return store
+
+def _add_players(columns: tuple):
+    from stomp.store import EntryStore
+    entry_ids, team, _, name, before, after = columns
+    store = EntryStore()
+    for row in zip(team.tolist(), name.tolist(), before.tolist(), after.tolist(), entry_ids.tolist()):
+        store.add_player(*row)
+    return store
+
+def build_cases() -> List[Case]:
+    """Every benchmark case, importing the code under test lazily."""
+    from utils import calculate_statistics
+    from utils.math_operations import generate_sequence, parse_numbers, perform_operation, validate_numbers
+    from utils.chart_helpers import create_line_chart, create_bar_chart, create_scatter_plot
+
+    cases = [
+        Case("validate_numbers", _strings, validate_numbers, max_size=10**7),
+        Case("parse_numbers", lambda size: "\n".join(_strings(size)), parse_numbers, max_size=10**7),
+    ]
+    for operation in ["Sum", "Average", "Product", "Product (log-space)", "Standard Deviation", "Cumulative Sum"]:
+        cases.append(Case(f"perform_operation[{operation}]", _random,
+                          lambda numbers, operation=operation: perform_operation(numbers, operation)))
+    cases.append(Case("calculate_statistics", _random, calculate_statistics))
+    cases.append(Case("calculate_statistics[generated]", lambda size: generate_sequence(0, 1, size, "random", seed=0),
+                      calculate_statistics))
+    for builder in [create_line_chart, create_bar_chart, create_scatter_plot]:
+        cases.append(Case(builder.__name__, _random,
+                          lambda numbers, builder=builder: builder(None, numbers, "Benchmark"), figure=True))
+    cases += [
+        Case("EntryStore.extend", _store_columns, _extend, max_size=10**7),
+        Case("EntryStore.add_player", _store_columns, _add_players, max_size=10**5),
+        Case("EntryStore.team_frame", _filled_store, lambda store: store.team_frame(0), max_size=10**7),
+        Case("EntryStore.overall_top_players", _filled_store, lambda store: store.overall_top_players(10),
+             max_size=10**7),
+    ]
+    return cases
+
+def measure(case: Case, size: int, repeat: int) -> Dict[str, Any]:
+    """Best-of-repeat wall time, peak traced memory and (for charts) figure JSON size."""
+    data = case.setup(size)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = case.run(data)
+        best = min(best, time.perf_counter() - started)
+        del result
+    tracemalloc.start()
+    try:
+        result = case.run(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "case": case.name,
+        "size": size,
+        "seconds": best,
+        "peak_bytes": peak,
+        "figure_json_bytes": len(result.to_json()) if case.figure else None,
+    }
+
+def run(cases: List[Case], sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """Measure every case at every size up to its max_size, printing as it goes."""
+    results = []
+    for case in cases:
+        # One untimed call first, so lazy imports and first-use setup
+        # (e.g. plotly, pandas) don't land in the smallest size's numbers.
+        case.run(case.setup(10))
+        for size in sizes:
+            if size > case.max_size:
+                continue
+            result = measure(case, size, repeat)
+            results.append(result)
+            figure = result["figure_json_bytes"]
+            print(f"{case.name:<36} {size:>11,} {result['seconds'] * 1000:>11.2f} ms "
+                  f"{result['peak_bytes'] / 2**20:>9.1f} MB" + (f" {figure:>10,} B json" if figure else ""),
+                  flush=True)
+    return results
+
+def environment() -> Dict[str, Any]:
+    """Where the results came from, so baselines from different machines aren't mixed up."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> int:
+    """Print time and memory ratios against a baseline; return how many cases regressed."""
+    previous = {(row["case"], row["size"]): row for row in baseline["results"]}
+    regressions = 0
+    print(f"\nCompared with the baseline from {baseline['environment']['created']}:")
+    for row in results:
+        old = previous.get((row["case"], row["size"]))
+        if old is None:
+            continue
+        time_ratio = row["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        memory_ratio = row["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else 1.0
+        regressed = time_ratio > 1 + tolerance
+        regressions += regressed
+        print(f"{row['case']:<36} {row['size']:>11,}  time x{time_ratio:.2f}  memory x{memory_ratio:.2f}"
+              + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--max-size", type=int, help="skip sizes above this")
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"compare against a baseline (default {os.path.relpath(DEFAULT_BASELINE)})")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown ratio over 1 counted as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    sizes = [size for size in args.sizes if args.max_size is None or size <= args.max_size]
+    cases = [case for case in build_cases() if not args.only or args.only in case.name]
+    results = run(cases, sizes, args.repeat)
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump({"environment": environment(), "results": results}, handle, indent=1)
+        print(f"\nSaved {len(results)} results to {args.save}")
+    if args.compare:
+        with open(args.compare) as handle:
+            return 1 if compare(results, json.load(handle), args.tolerance) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,36 @@
+# Started before the other imports so the startup report includes them.
+from startup import start_timer, render_startup_report
+startup_timer = start_timer("main.py")
+
 import streamlit as st
-import numpy as np
-from utils.math_operations import validate_numbers, perform_operation, generate_sequence
+from utils import calculate_statistics
+from utils.math_operations import (
+    parse_numbers, perform_operation, generate_sequence, GeneratedSequence, SEQUENCE_KINDS, MAX_SEQUENCE_LENGTH
+)
 from utils.chart_helpers import (
     create_line_chart,
     create_bar_chart,
     create_scatter_plot,
     apply_chart_styling
 )
+from utils.streaming_stats import MantissaExponent, checking_blocks
+from utils.cache import content_hash, parse_cache, result_cache, figure_cache, ALL_CACHES
+from utils.tracing import begin_rerun, render_debug_panel, span, traced
+from utils.file_input import (
+    FILE_TYPES, SERVER_DIR, save_upload, resolve_server_path, detect_format, csv_columns, describe_file, open_numbers
+)
+from utils.jobs import JobCancelled, submit_job, get_job, cancel_job, wait_job, pop_job
+
+# "Calculate and Plot" waits this long for its background job before
+# letting the page render; small inputs finish within it.
+JOB_WAIT_SECONDS = 0.25
+
+# How often the progress panel polls a running job.
+JOB_POLL_SECONDS = 0.5
+
+# Array results (Cumulative Sum) are summarized by their last value and
+# only this many leading values are shown.
+RESULT_PREVIEW = 10
 
 def initialize_session_state():
     """Initialize session state variables."""
@@ -14,19 +38,261 @@ def initialize_session_state():
         st.session_state.data_input = ""
     if 'operation_result' not in st.session_state:
         st.session_state.operation_result = None
+    if 'numbers' not in st.session_state:
+        st.session_state.numbers = None
+    if 'numbers_hash' not in st.session_state:
+        st.session_state.numbers_hash = ""
     if 'error_message' not in st.session_state:
         st.session_state.error_message = ""
+    if 'file_source' not in st.session_state:
+        st.session_state.file_source = None
+    if 'statistics' not in st.session_state:
+        st.session_state.statistics = None
+    if 'job_id' not in st.session_state:
+        st.session_state.job_id = ""
+    if 'job_input_key' not in st.session_state:
+        st.session_state.job_input_key = ""
+    if 'figure' not in st.session_state:
+        st.session_state.figure = None
+    if 'figure_key' not in st.session_state:
+        st.session_state.figure_key = None
+    if 'job_figure_key' not in st.session_state:
+        st.session_state.job_figure_key = None
 
-def main():
-    st.set_page_config(
-        page_title="Mathematical Chart Maker",
-        page_icon="📊",
-        layout="wide"
+@traced()
+def parse_input(text):
+    """Parse the text area, reusing the cached array for identical input."""
+    def parse():
+        valid, numbers, error = parse_numbers(text)
+        numbers.flags.writeable = False
+        return valid, numbers, error, content_hash(numbers) if valid else ""
+    return parse_cache.get_or_compute(content_hash(text), parse)
+
+def select_file():
+    """File uploader (or a path under SERVER_DIR) plus a column picker for CSVs; returns (path, column)."""
+    upload = st.file_uploader("Upload a .npy, raw float64 or CSV file", type=FILE_TYPES)
+    path = ""
+    if SERVER_DIR is not None:
+        path = st.text_input(f"...or a file path under {SERVER_DIR}",
+                             help="Avoids uploading large files through the browser").strip()
+        if path and upload is None:
+            try:
+                path = resolve_server_path(path)
+            except ValueError as error:
+                st.warning(str(error))
+                path = ""
+    if upload is not None:
+        path = save_upload(upload, upload.name, upload.file_id)
+    column = ""
+    if path and detect_format(path) == "csv":
+        try:
+            column = st.selectbox("Column", csv_columns(path))
+        except (OSError, ValueError) as error:
+            st.warning(f"Could not read the CSV header: {error}")
+    return path, column
+
+@traced()
+def open_file_input(path, column):
+    """Memory-map the selected file; returns (valid, numbers, error, hash, file metadata)."""
+    if not path:
+        return False, None, "Please choose a file", "", None
+    try:
+        source = describe_file(path, column)
+        numbers = open_numbers(source)
+    except ValueError as error:
+        return False, None, str(error), "", None
+    return True, numbers, "", source["key"], source
+
+def select_sequence():
+    """Widgets for a generated sequence; returns its parameters."""
+    kind = st.selectbox(
+        "Sequence", SEQUENCE_KINDS,
+        format_func=lambda kind: {"linspace": "Evenly spaced", "arange": "Fixed step",
+                                  "geometric": "Geometric", "random": "Random (uniform)"}[kind]
+    )
+    col1, col2 = st.columns(2)
+    start = col1.number_input("Start", value=0.0 if kind != "geometric" else 1.0)
+    end = col2.number_input("End", value=100.0)
+    params = {"kind": kind, "start": start, "end": end, "steps": 1000, "step": 1.0, "seed": None}
+    if kind == "arange":
+        params["step"] = col1.number_input("Step", value=1.0)
+    else:
+        params["steps"] = int(col1.number_input("Values", min_value=1, max_value=MAX_SEQUENCE_LENGTH, value=1000, step=1000))
+    if kind == "random":
+        params["seed"] = int(col2.number_input("Seed", min_value=0, value=0, step=1))
+    return params
+
+@traced()
+def open_sequence(params):
+    """Set up a generated sequence; returns (valid, numbers, error, hash) like parse_input.
+
+    Nothing is generated here: the sequence yields its blocks each time the
+    statistics, the operation or the chart read it.
+    """
+    try:
+        numbers = generate_sequence(**params)
+    except ValueError as error:
+        return False, None, str(error), ""
+    return True, numbers, "", content_hash(repr(numbers))
+
+@traced()
+def run_operation(numbers, numbers_hash, operation):
+    """Perform an operation, reusing the cached result for the same array."""
+    return result_cache.get_or_compute(
+        (numbers_hash, operation), lambda: perform_operation(numbers, operation)
     )
 
+def figure_key(numbers_hash, operation, chart_type, render_mode):
+    """What a figure was built from; keys the figure cache and the session's figure."""
+    return (numbers_hash, operation, chart_type, render_mode)
+
+@traced()
+def build_figure(numbers, numbers_hash, operation, chart_type, render_mode):
+    """Create and style the chart, reusing a cached figure for the same inputs."""
+    def build():
+        x_values = None  # plotted against the index, without materializing it
+        title = f"{operation} Visualization"
+        if chart_type == "Line Chart":
+            fig = create_line_chart(x_values, numbers, title, render_mode=render_mode)
+        elif chart_type == "Bar Chart":
+            fig = create_bar_chart(x_values, numbers, title)
+        else:  # Scatter Plot
+            fig = create_scatter_plot(x_values, numbers, title, render_mode=render_mode)
+        return apply_chart_styling(fig)
+    return figure_cache.get_or_compute(figure_key(numbers_hash, operation, chart_type, render_mode), build)
+
+@traced()
+def run_statistics(numbers, numbers_hash):
+    """One-pass summary statistics, reusing the cached result for the same data."""
+    return result_cache.get_or_compute((numbers_hash, "statistics"), lambda: calculate_statistics(numbers))
+
+def calculate(job, input_mode, input_value, operation, chart_type, render_mode):
+    """Background job behind "Calculate and Plot": read the input, run the operation, build the chart.
+
+    Runs on the job pool, so it must not touch st.*; the outcome is a dict
+    of session state updates picked up by collect_job on a later rerun.
+    """
+    source = None
+    job.report(0.05, "Reading input")
+    if input_mode == "Text":
+        valid, numbers, error, numbers_hash = parse_input(input_value)
+    elif input_mode == "File":
+        valid, numbers, error, numbers_hash, source = open_file_input(*input_value)
+    else:
+        valid, numbers, error, numbers_hash = open_sequence(input_value)
+    if not valid:
+        return {"error_message": error}
+    # Streamed inputs take one pass per step below; checking between blocks
+    # lets Cancel stop a long pass instead of waiting for it to finish.
+    with checking_blocks(job.check):
+        job.report(0.3, f"Calculating {operation}")
+        success, result, error = run_operation(numbers, numbers_hash, operation)
+        if not success:
+            return {"error_message": error}
+        job.report(0.5, "Calculating statistics")
+        statistics = run_statistics(numbers, numbers_hash)
+        job.report(0.7, "Building chart")
+        figure = build_figure(numbers, numbers_hash, operation, chart_type, render_mode)
+    job.report(1.0, "Done")
+    return {
+        "operation_result": result,
+        "statistics": statistics,
+        "numbers": numbers,
+        "numbers_hash": numbers_hash,
+        "file_source": source,
+        "figure": figure,
+        "figure_key": figure_key(numbers_hash, operation, chart_type, render_mode),
+        "error_message": "",
+    }
+
+def draw(job, numbers, numbers_hash, operation, chart_type, render_mode):
+    """Background job rebuilding only the chart, for chart options changed after a calculation."""
+    job.report(0.1, "Building chart")
+    with checking_blocks(job.check):
+        figure = build_figure(numbers, numbers_hash, operation, chart_type, render_mode)
+    job.report(1.0, "Done")
+    return {"figure": figure, "figure_key": figure_key(numbers_hash, operation, chart_type, render_mode)}
+
+def input_key(input_mode, input_value, operation, chart_type, render_mode):
+    """Identifies what a job computes, so a job for stale input or chart options can be cancelled."""
+    options = f"{operation}\0{chart_type}\0{render_mode}"
+    if input_mode == "Text":
+        return content_hash(f"{options}\0{input_value}")
+    return content_hash(f"{options}\0{input_mode}\0{input_value!r}")
+
+def start_job(function, key, *args, figure_wanted=None):
+    """Submit a job for this session (replacing a running one) and give it a moment to finish."""
+    if st.session_state.job_id:
+        cancel_job(st.session_state.job_id)
+    st.session_state.job_id = submit_job(function, *args)
+    st.session_state.job_input_key = key
+    st.session_state.job_figure_key = figure_wanted
+    wait_job(st.session_state.job_id, JOB_WAIT_SECONDS)
+
+def collect_job():
+    """Apply a finished job's outcome to the session state (nothing while it runs)."""
+    job = pop_job(st.session_state.job_id) if st.session_state.job_id else None
+    if job is None:
+        if st.session_state.job_id and get_job(st.session_state.job_id) is None:
+            st.session_state.job_id = ""  # cancelled, or collected by another tab of this session
+        return
+    st.session_state.job_id = ""
+    try:
+        st.session_state.update(job.result())
+    except JobCancelled:
+        pass
+    except Exception as error:
+        st.session_state.error_message = f"Error in calculation: {error}"
+        skip_figure()
+
+def skip_figure():
+    """After a chart job failed or was cancelled, don't resubmit it until the chart options change."""
+    if st.session_state.job_figure_key is not None:
+        st.session_state.figure = None
+        st.session_state.figure_key = st.session_state.job_figure_key
+
+def request_figure(operation, chart_type, render_mode, key):
+    """Make sure the session's figure matches the chart options, building it on the job pool if needed.
+
+    Changing the chart type, rendering or operation after a calculation
+    (or an evicted cache entry) would otherwise mean another full pass over
+    the data on the script thread.
+    """
+    wanted = figure_key(st.session_state.numbers_hash, operation, chart_type, render_mode)
+    if st.session_state.figure_key == wanted or st.session_state.job_id:
+        return
+    cached = figure_cache.get(wanted)
+    if cached is not None:
+        st.session_state.figure, st.session_state.figure_key = cached, wanted
+        return
+    start_job(draw, key, st.session_state.numbers, st.session_state.numbers_hash, operation, chart_type,
+              render_mode, figure_wanted=wanted)
+    collect_job()
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_job_progress():
+    """Progress bar and Cancel button for the running job, polled without rerunning the page."""
+    job = get_job(st.session_state.job_id) if st.session_state.job_id else None
+    if job is None or job.done():
+        st.rerun()  # full rerun, which collects the result (or forgets a job cancelled elsewhere)
+    st.progress(job.progress, text=job.message)
+    if st.button("Cancel"):
+        cancel_job(job.id)
+        st.session_state.job_id = ""
+        skip_figure()
+        st.rerun()
+
+def render_cache_stats():
+    """Show hit/miss counters for the shared caches in the sidebar."""
+    with st.sidebar.expander("Cache statistics"):
+        st.dataframe([cache.stats() for cache in ALL_CACHES], hide_index=True)
+
+def render_page(recorder):
+    """Render the whole page for one rerun, ending with the debug panel for its recorder."""
     initialize_session_state()
 
     st.title("📊 Mathematical Chart Maker")
+    startup_timer.mark("first paint (title)")
     st.markdown("---")
 
     # Create two columns for input and visualization
@@ -34,17 +300,23 @@ def main():
 
     with input_col:
         st.subheader("Data Input")
-        data_input = st.text_area(
-            "Enter numbers (one per line):",
-            value=st.session_state.data_input,
-            height=150,
-            key="data_input_area"
-        )
+        input_mode = st.radio("Input mode", ["Text", "File", "Generate"], horizontal=True)
+        if input_mode == "Text":
+            input_value = st.text_area(
+                "Enter numbers (one per line):",
+                value=st.session_state.data_input,
+                height=150,
+                key="data_input_area"
+            )
+        elif input_mode == "File":
+            input_value = select_file()
+        else:
+            input_value = select_sequence()
 
         # Mathematical operations selection
         operation = st.selectbox(
             "Select Operation",
-            ["Sum", "Average", "Product", "Standard Deviation", "Cumulative Sum"]
+            ["Sum", "Average", "Product", "Product (log-space)", "Standard Deviation", "Cumulative Sum"]
         )
 
         # Chart type selection
@@ -53,23 +325,34 @@ def main():
             ["Line Chart", "Bar Chart", "Scatter Plot"]
         )
 
+        # Rendering: WebGL above a point count ("auto"), or forced either way
+        render_mode = st.selectbox(
+            "Rendering",
+            ["auto", "svg", "webgl"],
+            format_func=lambda mode: {"auto": "Auto", "svg": "SVG", "webgl": "WebGL"}[mode]
+        )
+
+        key = input_key(input_mode, input_value, operation, chart_type, render_mode)
+
+        # A job started for input that has since changed is no longer wanted.
+        if st.session_state.job_id and st.session_state.job_input_key != key:
+            cancel_job(st.session_state.job_id)
+            st.session_state.job_id = ""
+
         if st.button("Calculate and Plot"):
-            # Validate input
-            valid, numbers, error = validate_numbers(data_input.split('\n'))
-            
-            if valid:
-                # Perform mathematical operation
-                success, result, error = perform_operation(numbers, operation)
-                
-                if success:
-                    st.session_state.operation_result = result
-                    st.session_state.error_message = ""
-                else:
-                    st.session_state.error_message = error
-            else:
-                st.session_state.error_message = error
+            # Parsing, the operation and the chart run on the job pool, so a
+            # large input doesn't block this session's script thread. Files
+            # are memory-mapped, so only the mapping lives in the session.
+            start_job(calculate, key, input_mode, input_value, operation, chart_type, render_mode)
+        collect_job()
+        if st.session_state.operation_result is not None:
+            request_figure(operation, chart_type, render_mode, key)
 
     with viz_col:
+        # The fragment polls on a timer, so it only exists while a job runs.
+        if st.session_state.job_id:
+            render_job_progress()
+
         # Display error message if any
         if st.session_state.error_message:
             st.error(st.session_state.error_message)
@@ -79,43 +362,82 @@ def main():
             st.subheader("Results")
             
             # Display numerical results
-            if isinstance(st.session_state.operation_result, (int, float)):
+            if isinstance(st.session_state.operation_result, MantissaExponent):
+                mantissa, exponent = st.session_state.operation_result
+                st.metric(operation, f"{mantissa:.6f} × 10^{exponent}" if exponent else f"{mantissa:.6f}")
+            elif isinstance(st.session_state.operation_result, (int, float)):
                 st.metric(operation, f"{st.session_state.operation_result:.2f}")
+            elif hasattr(st.session_state.operation_result, "shape"):
+                totals = st.session_state.operation_result
+                st.metric(f"{operation} (last value)", f"{totals[-1]:.2f}")
+                st.caption(f"{len(totals):,} values; the first {min(len(totals), RESULT_PREVIEW)}:")
+                st.dataframe({operation: totals[:RESULT_PREVIEW]}, hide_index=True)
             else:
                 st.write(f"{operation} result:", st.session_state.operation_result)
 
-            # Generate x-axis values
-            x_values = list(range(len(data_input.split('\n'))))
-            y_values = [float(num.strip()) for num in data_input.split('\n') if num.strip()]
+            # The figure is built on the job pool (request_figure); until a
+            # rebuild finishes, the progress bar above stands in for it.
+            fig = st.session_state.figure
+            wanted = figure_key(st.session_state.numbers_hash, operation, chart_type, render_mode)
+            if fig is not None and st.session_state.figure_key == wanted:
+                with span("st.plotly_chart"):
+                    st.plotly_chart(fig, use_container_width=True)
+                meta = fig.layout.meta
+                if meta and meta["downsampled"]:
+                    st.caption(f"Showing {meta['points_shown']:,} of {meta['points_total']:,} points")
+            elif st.session_state.figure_key == wanted:
+                st.info("The chart wasn't built; click 'Calculate and Plot' to try again")
+            source = st.session_state.file_source
+            if source is not None and source["key"] == st.session_state.numbers_hash:
+                st.caption(
+                    f"{len(st.session_state.numbers):,} values memory-mapped from "
+                    f"{source['format']} file ({source['size'] / 2**20:,.1f} MB)"
+                )
+            if isinstance(st.session_state.numbers, GeneratedSequence):
+                st.caption(f"{len(st.session_state.numbers):,} values generated block by block, never held in memory")
+            if st.session_state.statistics is not None:
+                st.dataframe([st.session_state.statistics], hide_index=True)
 
-            # Create appropriate chart
-            if chart_type == "Line Chart":
-                fig = create_line_chart(x_values, y_values, f"{operation} Visualization")
-            elif chart_type == "Bar Chart":
-                fig = create_bar_chart(x_values, y_values, f"{operation} Visualization")
-            else:  # Scatter Plot
-                fig = create_scatter_plot(x_values, y_values, f"{operation} Visualization")
-
-            # Apply styling and display chart
-            fig = apply_chart_styling(fig)
-            st.plotly_chart(fig, use_container_width=True)
+    startup_timer.mark("page rendered")
+    render_cache_stats()
+    render_startup_report(startup_timer)
+    render_debug_panel(recorder)
 
     # Add help section
     with st.expander("Help & Instructions"):
         st.markdown("""
         ### How to use this app:
-        1. Enter your numbers in the text area (one number per line)
+        1. Enter your numbers in the text area (one number per line), or switch to
+           File mode and upload (or, if CHART_SERVER_DIR is set, give the server
+           path of) a .npy file, a raw float64 file or a CSV column, or switch to
+           Generate mode for an evenly spaced, fixed-step, geometric or seeded
+           random sequence
         2. Select a mathematical operation to perform
         3. Choose a chart type for visualization
-        4. Click 'Calculate and Plot' to see the results
+        4. Click 'Calculate and Plot' to see the results. Large inputs are computed
+           in the background with a progress bar and a Cancel button; changing the
+           input, operation or chart options cancels a calculation that is still
+           running, and changing the chart options afterwards redraws the chart
+           in the background
 
         ### Available Operations:
         - **Sum**: Calculates the total of all numbers
         - **Average**: Calculates the mean of the numbers
         - **Product**: Multiplies all numbers together
+        - **Product (log-space)**: Multiplies in log space, so very large or small products don't overflow to inf or 0
         - **Standard Deviation**: Calculates the standard deviation
         - **Cumulative Sum**: Shows the running total
         """)
 
+def main():
+    st.set_page_config(
+        page_title="Mathematical Chart Maker",
+        page_icon="📊",
+        layout="wide"
+    )
+
+    with begin_rerun("main.py") as recorder:
+        render_page(recorder)
+
 if __name__ == "__main__":
     main()
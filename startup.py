@@ -0,0 +1,66 @@
+"""Startup timing for the Streamlit entry points (app.py and main.py).
+
+Import this module, and call start_timer(), before any other import in an
+entry point, so the timer also covers the script's own imports. It only
+uses the standard library, so starting it costs next to nothing.
+"""
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Modules whose import dominates a cold start; the report shows which of
+# them were already loaded at each milestone.
+HEAVY_MODULES = ("numpy", "pandas", "plotly.graph_objects", "plotly.express", "pyarrow")
+
+logger = logging.getLogger(__name__)
+
+# The first run of each script in the process, i.e. the cold start.
+_cold_starts: Dict[str, "StartupTimer"] = {}
+
+class StartupTimer:
+    """Milestones of one script run, in milliseconds since the run started."""
+
+    def __init__(self, script: str):
+        self.script = script
+        self.started = time.perf_counter()
+        self.cold = script not in _cold_starts
+        self.marks: List[tuple] = []
+
+    def mark(self, milestone: str) -> None:
+        """Record a milestone and the heavy modules loaded by then."""
+        elapsed = (time.perf_counter() - self.started) * 1000
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        self.marks.append((milestone, elapsed, loaded))
+        if self.cold:
+            logger.info("%s cold start: %s after %.0f ms (loaded: %s)",
+                        self.script, milestone, elapsed, ", ".join(loaded) or "none")
+
+    def report(self) -> List[Dict[str, object]]:
+        """One row per milestone, for display as a table."""
+        return [
+            {"milestone": milestone, "ms": round(elapsed, 1), "heavy modules loaded": ", ".join(loaded) or "none"}
+            for milestone, elapsed, loaded in self.marks
+        ]
+
+def start_timer(script: str) -> StartupTimer:
+    """Start timing a script run; the first run of each script is kept as its cold start."""
+    timer = StartupTimer(script)
+    if timer.cold:
+        _cold_starts[script] = timer
+    return timer
+
+def cold_start(script: str) -> Optional[StartupTimer]:
+    """The timer of the script's first run in this process, if it has run."""
+    return _cold_starts.get(script)
+
+def render_startup_report(timer: StartupTimer) -> None:
+    """Sidebar expander with the cold start and the current run's milestones."""
+    import streamlit as st
+    with st.sidebar.expander("Startup time"):
+        cold = cold_start(timer.script)
+        if cold is not None and cold is not timer:
+            st.caption("Cold start (first run in this process)")
+            st.table(cold.report())
+        st.caption("Cold start" if timer.cold else "This run")
+        st.table(timer.report())
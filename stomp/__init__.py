@@ -0,0 +1 @@
+"""State helpers for the Andrew and Shadows Stomp Counter (app.py)."""
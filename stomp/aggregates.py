@@ -0,0 +1,58 @@
+class TeamAggregate:
+    """Running totals for one team, updated in O(1) on every add and delete."""
+
+    __slots__ = (
+        "player_count",
+        "penalty_count",
+        "score_before",
+        "score_after",
+        "player_difference",
+        "penalty_difference",
+    )
+
+    def __init__(self):
+        self.player_count = 0
+        self.penalty_count = 0
+        self.score_before = 0
+        self.score_after = 0
+        self.player_difference = 0
+        self.penalty_difference = 0
+
+    @property
+    def total(self) -> int:
+        """Team total: player differences plus (negative) penalties."""
+        return self.player_difference + self.penalty_difference
+
+    def add_player(self, score_before: int, score_after: int) -> None:
+        """Account for a newly added player."""
+        self.player_count += 1
+        self.score_before += score_before
+        self.score_after += score_after
+        self.player_difference += score_after - score_before
+
+    def remove_player(self, score_before: int, score_after: int) -> None:
+        """Account for a deleted player."""
+        self.player_count -= 1
+        self.score_before -= score_before
+        self.score_after -= score_after
+        self.player_difference -= score_after - score_before
+
+    def add_penalty(self, difference: int) -> None:
+        """Account for a newly added penalty (difference is negative)."""
+        self.penalty_count += 1
+        self.penalty_difference += difference
+
+    def remove_penalty(self, difference: int) -> None:
+        """Account for a deleted penalty."""
+        self.penalty_count -= 1
+        self.penalty_difference -= difference
+
+    def add_totals(self, player_count: int, score_before: int, score_after: int,
+                   penalty_count: int, penalty_difference: int) -> None:
+        """Account for a whole batch of players and penalties at once."""
+        self.player_count += player_count
+        self.penalty_count += penalty_count
+        self.score_before += score_before
+        self.score_after += score_after
+        self.player_difference += score_after - score_before
+        self.penalty_difference += penalty_difference
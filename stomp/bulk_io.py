@@ -0,0 +1,141 @@
+import io
+import numpy as np
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional, Tuple
+from stomp.store import EntryStore, TEAM_NAMES, PLAYER, PENALTY
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+IMPORT_CHUNK_ROWS = 50_000
+
+EXPORT_COLUMNS = ["Team", "Name", "Score Before", "Score After", "Difference"]
+
+# Largest score the number inputs accept (and float64 holds every integer up to).
+MAX_SCORE = 2**53 - 1
+
+
+def iter_import_chunks(file: BinaryIO, filename: str, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator["pd.DataFrame"]:
+    """Stream a CSV or Parquet upload as DataFrames of at most chunk_rows rows."""
+    import pandas as pd
+    if filename.lower().endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet import requires the pyarrow package")
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file, chunksize=chunk_rows, skipinitialspace=True)
+
+
+def running_totals() -> List[List[int]]:
+    """Per-team [Score Before, Score After, Difference] sums that validate_chunk carries between chunks."""
+    return [[0, 0, 0] for _ in TEAM_NAMES]
+
+
+def validate_chunk(chunk: "pd.DataFrame", totals: Optional[List[List[int]]] = None
+                   ) -> Tuple[List[Tuple[int, int, str, int, int, int]], int]:
+    """Validate a chunk with vectorized checks and return (entry rows, rejected count).
+
+    Players follow the render_player_input rules: a non-empty name and
+    Score After >= Score Before. Rows without scores but with a negative
+    Difference are penalties, as written by export_frame, and follow the
+    render_penalty_input rules.
+
+    A row named TOTAL is skipped only if it is an exported team total: its
+    scores equal the sums of its team's valid rows since that team's last
+    total. Pass the same running_totals() for every chunk of a file so the
+    sums carry across chunks. Any other TOTAL row is validated like a player.
+    """
+    import pandas as pd
+    missing = [column for column in ("Team", "Name") if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    if totals is None:
+        totals = running_totals()
+
+    name = chunk["Name"].astype("string").str.strip()
+    team_label = chunk["Team"].astype("string").str.strip()
+    team = pd.Series(np.full(len(chunk), -1, dtype=np.int8), index=chunk.index)
+    for team_id, team_name in enumerate(TEAM_NAMES):
+        team[(team_label == team_name) | (team_label == str(team_id + 1))] = team_id
+    team = team.to_numpy()
+
+    def numeric(column: str) -> np.ndarray:
+        if column not in chunk.columns:
+            return np.full(len(chunk), np.nan)
+        return pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def whole(values: np.ndarray) -> np.ndarray:
+        # False for NaN and inf too, so only these rows are cast to int64.
+        with np.errstate(invalid="ignore"):
+            return (np.mod(values, 1) == 0) & (np.abs(values) <= MAX_SCORE)
+
+    before = numeric("Score Before")
+    after = numeric("Score After")
+    difference = numeric("Difference")
+
+    has_name = (name.str.len() > 0).fillna(False).to_numpy(dtype=bool)
+    has_team = team >= 0
+    has_scores = ~np.isnan(before) & ~np.isnan(after)
+    is_player = has_scores & whole(before) & whole(after) & (before >= 0) & (after >= before)
+    is_penalty = ~has_scores & whole(difference) & (difference < 0)
+    valid = has_name & has_team & (is_player | is_penalty)
+
+    kind = np.where(is_player, PLAYER, PENALTY)
+    before_values = np.where(valid & is_player, before, 0).astype(np.int64)
+    after_values = np.where(valid & is_player, after, 0).astype(np.int64)
+    penalty_values = np.where(valid & is_penalty, difference, 0).astype(np.int64)
+    difference_values = np.where(kind == PLAYER, after_values - before_values, penalty_values)
+
+    def add_totals(start: int, stop: int) -> None:
+        for team_id, sums in enumerate(totals):
+            rows = valid[start:stop] & (team[start:stop] == team_id)
+            for column, values in enumerate((before_values, after_values, difference_values)):
+                sums[column] += sum(values[start:stop][rows].tolist())
+
+    # The few TOTAL rows are checked in order against the sums up to them.
+    total = np.zeros(len(chunk), dtype=bool)
+    candidates = (name == "TOTAL").fillna(False).to_numpy(dtype=bool) & has_team & has_scores & whole(difference)
+    start = 0
+    for row in np.flatnonzero(candidates).tolist():
+        add_totals(start, row)
+        start = row
+        sums = totals[team[row]]
+        if [before[row], after[row], difference[row]] == sums:
+            total[row] = True
+            sums[:] = [0, 0, 0]
+            start = row + 1
+    add_totals(start, len(chunk))
+
+    valid &= ~total
+    rows = list(zip(
+        team[valid].tolist(),
+        kind[valid].tolist(),
+        name.to_numpy()[valid].tolist(),
+        before_values[valid].tolist(),
+        after_values[valid].tolist(),
+        difference_values[valid].tolist(),
+    ))
+    return rows, int((~total & ~valid).sum())
+
+
+def export_frame(entries: EntryStore) -> "pd.DataFrame":
+    """Both teams' players, penalties and TOTAL rows as one frame, built from the columns."""
+    import pandas as pd
+    frames = []
+    for team, team_name in enumerate(TEAM_NAMES):
+        frame = entries.team_frame(team)
+        frame.insert(0, "Team", team_name)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)[EXPORT_COLUMNS]
+
+
+def export_bytes(entries: EntryStore, file_format: str) -> bytes:
+    """Serialize export_frame as CSV or Parquet."""
+    frame = export_frame(entries)
+    if file_format == "Parquet":
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return frame.to_csv(index=False).encode("utf-8")
@@ -0,0 +1,248 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+from stomp.events import (
+    Event,
+    PLAYER_ADDED,
+    PENALTY_ADDED,
+    ENTRY_DELETED,
+    ENTRY_RESTORED,
+    SNAPSHOT_INTERVAL,
+    apply_events,
+)
+from stomp.store import EntryStore, PLAYER
+
+DB_PATH = os.environ.get("STOMP_DB_PATH", "stomp_counter.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game TEXT PRIMARY KEY,
+    rev INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    team INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    score_before INTEGER NOT NULL,
+    score_after INTEGER NOT NULL,
+    difference INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    rev INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_game_team ON entries (game, team);
+CREATE INDEX IF NOT EXISTS entries_game_rev ON entries (game, rev);
+CREATE TABLE IF NOT EXISTS events (
+    game TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    type TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    team INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    score_before INTEGER NOT NULL,
+    score_after INTEGER NOT NULL,
+    difference INTEGER NOT NULL,
+    PRIMARY KEY (game, seq)
+);
+CREATE INDEX IF NOT EXISTS events_game_ts ON events (game, ts);
+CREATE TABLE IF NOT EXISTS snapshots (
+    game TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (game, seq)
+);
+"""
+
+ENTRY_COLUMNS = "id, team, kind, name, score_before, score_after, difference"
+
+# (team, kind, name, score_before, score_after, difference)
+EntryRow = Tuple[int, int, str, int, int, int]
+
+# (id, team, kind, name, score_before, score_after, difference, deleted, rev)
+ChangeRow = Tuple[int, int, int, str, int, int, int, int, int]
+
+
+class GameDatabase:
+    """SQLite-backed store of every game's entries, shared by all sessions in a process.
+
+    Every change is appended to the events log under the game's next
+    sequence number (its revision) and mirrored into the entries table,
+    whose rows are stamped with the revision that last touched them. A
+    session only has to pull rows with a newer revision to catch up with
+    other scorekeepers. A compact snapshot is stored every
+    SNAPSHOT_INTERVAL events, so rebuilding a game, or viewing it at an
+    earlier point, loads one snapshot and replays only the events after it.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+
+    def _bump_rev(self, game: str, count: int) -> int:
+        """Reserve count revisions for a game and return the first one."""
+        self.conn.execute("INSERT OR IGNORE INTO games (game, rev) VALUES (?, 0)", (game,))
+        (rev,) = self.conn.execute(
+            "UPDATE games SET rev = rev + ? WHERE game = ? RETURNING rev", (count, game)
+        ).fetchone()
+        return rev - count + 1
+
+    def _log_events(self, game: str, first: int, event_types: Iterable[str], rows: Iterable[tuple]) -> None:
+        """Append one event per (id, team, kind, name, before, after, difference) row."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT INTO events (game, seq, ts, type, entry_id, team, kind, name, score_before, score_after, difference) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((game, first + i, now, event_type, *row) for i, (event_type, row) in enumerate(zip(event_types, rows))),
+        )
+
+    def _write(self, game: str, apply) -> list:
+        """Run apply() in an IMMEDIATE transaction, then snapshot the game if one is due."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = apply()
+                self._snapshot_if_due(game)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def add_entries(self, game: str, rows: Sequence[EntryRow]) -> List[int]:
+        """Insert a batch of entries in a single transaction and return their ids."""
+        if not rows:
+            return []
+
+        def apply() -> List[int]:
+            first = self._bump_rev(game, len(rows))
+            (last_id,) = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM entries").fetchone()
+            entries = [(last_id + 1 + i, *row) for i, row in enumerate(rows)]
+            self.conn.executemany(
+                f"INSERT INTO entries (game, {ENTRY_COLUMNS}, rev) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((game, *entry, first + i) for i, entry in enumerate(entries)),
+            )
+            self._log_events(
+                game, first, (PLAYER_ADDED if row[1] == PLAYER else PENALTY_ADDED for row in rows), entries
+            )
+            return [entry[0] for entry in entries]
+
+        return self._write(game, apply)
+
+    def _set_deleted(self, game: str, entry_ids: Iterable[int], deleted: bool) -> List[int]:
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return []
+
+        def apply() -> List[int]:
+            rows = self.conn.execute(
+                f"SELECT {ENTRY_COLUMNS} FROM entries WHERE game = ? AND deleted = ? "
+                "AND id IN (SELECT value FROM json_each(?)) ORDER BY id",
+                (game, int(not deleted), json.dumps(entry_ids)),
+            ).fetchall()
+            if not rows:
+                return []
+            first = self._bump_rev(game, len(rows))
+            self.conn.executemany(
+                "UPDATE entries SET deleted = ?, rev = ? WHERE id = ?",
+                ((int(deleted), first + i, row[0]) for i, row in enumerate(rows)),
+            )
+            event_type = ENTRY_DELETED if deleted else ENTRY_RESTORED
+            self._log_events(game, first, (event_type for _ in rows), rows)
+            return [row[0] for row in rows]
+
+        return self._write(game, apply)
+
+    def delete_entries(self, game: str, entry_ids: Iterable[int]) -> List[int]:
+        """Delete a batch of live entries and return the ids actually deleted."""
+        return self._set_deleted(game, entry_ids, True)
+
+    def restore_entries(self, game: str, entry_ids: Iterable[int]) -> List[int]:
+        """Bring back a batch of deleted entries and return the ids actually restored."""
+        return self._set_deleted(game, entry_ids, False)
+
+    def changes_since(self, game: str, rev: int) -> List[ChangeRow]:
+        """Entries inserted or deleted after the given revision, oldest first."""
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT {ENTRY_COLUMNS}, deleted, rev "
+                "FROM entries WHERE game = ? AND rev > ? ORDER BY rev",
+                (game, rev),
+            ).fetchall()
+
+    def _events_between(self, game: str, after: int, until: Optional[int]) -> List[Event]:
+        return self.conn.execute(
+            "SELECT seq, type, entry_id, team, kind, name, score_before, score_after, difference "
+            "FROM events WHERE game = ? AND seq > ? AND seq <= ? ORDER BY seq",
+            (game, after, until if until is not None else 2 ** 62),
+        ).fetchall()
+
+    def _state_at(self, game: str, seq: Optional[int]) -> Tuple[EntryStore, int]:
+        snapshot = self.conn.execute(
+            "SELECT seq, data FROM snapshots WHERE game = ? AND seq <= ? ORDER BY seq DESC LIMIT 1",
+            (game, seq if seq is not None else 2 ** 62),
+        ).fetchone()
+        if snapshot is None:
+            store, snapshot_seq = EntryStore(), 0
+        else:
+            snapshot_seq, data = snapshot
+            store = EntryStore.from_snapshot(data)
+        return store, apply_events(store, self._events_between(game, snapshot_seq, seq), snapshot_seq)
+
+    def state_at(self, game: str, seq: Optional[int] = None) -> Tuple[EntryStore, int]:
+        """Rebuild a game as of an event seq (latest if None) from the nearest snapshot."""
+        with self.lock:
+            return self._state_at(game, seq)
+
+    def _snapshot_if_due(self, game: str) -> None:
+        row = self.conn.execute("SELECT rev FROM games WHERE game = ?", (game,)).fetchone()
+        if row is None:  # nothing was ever written, e.g. a delete that matched no entries
+            return
+        (head,) = row
+        (latest,) = self.conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM snapshots WHERE game = ?", (game,)
+        ).fetchone()
+        if head - latest >= SNAPSHOT_INTERVAL:
+            store, seq = self._state_at(game, head)
+            self.conn.execute(
+                "INSERT INTO snapshots (game, seq, data) VALUES (?, ?, ?)", (game, seq, store.to_snapshot())
+            )
+
+    def seq_at_time(self, game: str, ts: float) -> int:
+        """The last event seq logged at or before a Unix timestamp (0 if none)."""
+        with self.lock:
+            (seq,) = self.conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM events WHERE game = ? AND ts <= ?", (game, ts)
+            ).fetchone()
+        return seq
+
+    def event_time_range(self, game: str) -> Optional[Tuple[float, float]]:
+        """Timestamps of a game's first and last events, or None if it has none."""
+        with self.lock:
+            first, last = self.conn.execute(
+                "SELECT MIN(ts), MAX(ts) FROM events WHERE game = ?", (game,)
+            ).fetchone()
+        return None if first is None else (first, last)
+
+
+_database: Optional[GameDatabase] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> GameDatabase:
+    """Return the process-wide database connection, opening it on first use."""
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = GameDatabase()
+        return _database
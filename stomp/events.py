@@ -0,0 +1,35 @@
+from typing import Sequence, Tuple
+from stomp.store import EntryStore
+
+PLAYER_ADDED = "PlayerAdded"
+PENALTY_ADDED = "PenaltyAdded"
+ENTRY_DELETED = "EntryDeleted"
+ENTRY_RESTORED = "EntryRestored"
+
+# A snapshot is written once this many events have been logged since the last one.
+SNAPSHOT_INTERVAL = 1000
+
+# (seq, type, entry_id, team, kind, name, score_before, score_after, difference)
+Event = Tuple[int, str, int, int, int, str, int, int, int]
+
+
+def apply_events(store: EntryStore, events: Sequence[Event], seq: int) -> int:
+    """Replay events, oldest first, onto a store and return the last applied seq.
+
+    Runs of inserts are applied as one batch through apply_changes; a
+    delete flushes the pending batch first so ordering is preserved.
+    """
+    pending = []
+    for event_seq, event_type, entry_id, team, kind, name, score_before, score_after, difference in events:
+        if event_type == ENTRY_DELETED:
+            if pending:
+                store.apply_changes(pending, seq)
+                pending = []
+            if entry_id in store:
+                store.delete(entry_id)
+        else:
+            pending.append((entry_id, team, kind, name, score_before, score_after, difference, 0, event_seq))
+        seq = event_seq
+    if pending:
+        store.apply_changes(pending, seq)
+    return seq
@@ -0,0 +1,94 @@
+import bisect
+import heapq
+from itertools import islice
+from typing import Iterable, List, Tuple
+import numpy as np
+
+# Players kept per leaderboard; the sidebar's "Top players shown" goes up to 50.
+CAPACITY = 50
+
+
+def best_indices(entry_ids: np.ndarray, differences: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best players by Difference, best first (ties: smaller entry id first).
+
+    np.partition finds the k-th best difference in O(n); only the players at
+    or above it are sorted.
+    """
+    if len(differences) > k:
+        threshold = np.partition(differences, len(differences) - k)[len(differences) - k]
+        candidates = np.flatnonzero(differences >= threshold)
+    else:
+        candidates = np.arange(len(differences))
+    order = np.lexsort((entry_ids[candidates], -differences[candidates]))
+    return candidates[order[:k]]
+
+
+class Leaderboard:
+    """A team's best players by Difference, best first, maintained on insert and delete.
+
+    Only the best `capacity` keys (-difference, entry_id) are kept, in a
+    sorted list, so memory doesn't grow with the team and an insert is
+    O(log capacity). Deleting one of the kept players leaves the list short
+    of the true top, so the board is marked stale and the store refills it
+    from its columns (see best_indices) on the next read.
+    """
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.keys: List[Tuple[int, int]] = []
+        self.count = 0
+        self.stale = False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, entry_id: int, difference: int) -> None:
+        """Insert a player."""
+        self.count += 1
+        key = (-difference, entry_id)
+        if self.stale or (len(self.keys) == self.capacity and key > self.keys[-1]):
+            return
+        bisect.insort(self.keys, key)
+        del self.keys[self.capacity:]
+
+    def add_many(self, entry_ids: np.ndarray, differences: np.ndarray) -> None:
+        """Insert a batch of players, keeping only the batch's best in one vectorized pass."""
+        self.count += len(entry_ids)
+        if self.stale or not len(entry_ids):
+            return
+        best = best_indices(entry_ids, differences, self.capacity)
+        batch = zip((-differences[best]).tolist(), entry_ids[best].tolist())
+        self.keys = list(islice(heapq.merge(self.keys, batch), self.capacity))
+
+    def remove(self, entry_id: int, difference: int) -> None:
+        """Remove a player previously added with the same difference."""
+        self.count -= 1
+        key = (-difference, entry_id)
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            del self.keys[index]
+            self.stale = self.stale or self.count > len(self.keys)
+
+    def refill(self, entry_ids: np.ndarray, differences: np.ndarray) -> None:
+        """Rebuild the kept keys from all of the team's players."""
+        best = best_indices(entry_ids, differences, self.capacity)
+        self.keys = list(zip((-differences[best]).tolist(), entry_ids[best].tolist()))
+        self.count = len(entry_ids)
+        self.stale = False
+
+    def top(self, k: int) -> List[Tuple[int, int]]:
+        """The k best players (k <= capacity) as (entry_id, difference) pairs."""
+        return [(entry_id, -negative) for negative, entry_id in self.keys[:k]]
+
+
+def merged_top(leaderboards: Iterable[Leaderboard], k: int) -> List[Tuple[int, int, int]]:
+    """The k best players across several leaderboards as (board index, entry_id, difference).
+
+    Merges lazily, so only the first k keys of each board are touched.
+    """
+    def stream(board: int, leaderboard: Leaderboard):
+        for negative, entry_id in islice(leaderboard.keys, k):
+            yield negative, entry_id, board
+
+    streams = [stream(board, leaderboard) for board, leaderboard in enumerate(leaderboards)]
+    return [(board, entry_id, -negative) for negative, entry_id, board in islice(heapq.merge(*streams), k)]
@@ -0,0 +1,364 @@
+import io
+import numpy as np
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+from stomp.aggregates import TeamAggregate
+from stomp.leaderboard import CAPACITY, Leaderboard, best_indices, merged_top
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+TEAM_NAMES = ("Team 1", "Team 2")
+
+PLAYER = 0
+PENALTY = 1
+
+
+class EntryStore:
+    """Columnar, array-backed table of every player and penalty in a game.
+
+    Each row has a stable entry id, a team id, a kind (PLAYER or PENALTY)
+    and integer scores. Penalties have no Score Before/After; those cells
+    are reported as missing through a mask derived from the kind column
+    rather than by storing a placeholder string.
+
+    Rows are kept in entry id order (ids are handed out in increasing
+    order, so appends keep it), which makes the id column its own index:
+    an id is found by binary search, with no per-row Python objects.
+
+    Deletes are O(log n): the row is tombstoned through the alive column.
+    Re-adding a tombstoned id (a restore) revives its row in place. Once
+    tombstones outnumber live rows the columns are compacted in one
+    vectorized pass, so the cost is amortized over the deletes that
+    produced them.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.dead = 0
+        self.next_id = 1
+        self.entry_id = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.team = np.zeros(capacity, dtype=np.int8)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.score_before = np.zeros(capacity, dtype=np.int64)
+        self.score_after = np.zeros(capacity, dtype=np.int64)
+        self.difference = np.zeros(capacity, dtype=np.int64)
+        self.name = np.empty(capacity, dtype=object)
+        self.aggregates = tuple(TeamAggregate() for _ in TEAM_NAMES)
+        self.leaderboards = tuple(Leaderboard() for _ in TEAM_NAMES)
+
+    def __len__(self) -> int:
+        return self.size - self.dead
+
+    def __contains__(self, entry_id: int) -> bool:
+        return self._find(entry_id) >= 0
+
+    def _columns(self) -> Tuple[np.ndarray, ...]:
+        return (
+            self.entry_id, self.alive, self.team, self.kind,
+            self.score_before, self.score_after, self.difference, self.name,
+        )
+
+    def _reserve(self, extra: int) -> None:
+        """Grow every column geometrically so appends are amortized O(1)."""
+        needed = self.size + extra
+        capacity = len(self.team)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for attr in ("entry_id", "alive", "team", "kind", "score_before", "score_after", "difference", "name"):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype) if old.dtype != object else np.empty(capacity, dtype=object)
+            new[:self.size] = old[:self.size]
+            setattr(self, attr, new)
+
+    def aggregate(self, team: int) -> TeamAggregate:
+        """Running totals for one team."""
+        return self.aggregates[team]
+
+    def _find(self, entry_id: int) -> int:
+        """Row slot of a live entry id, or -1."""
+        row = int(np.searchsorted(self.entry_id[:self.size], entry_id))
+        if row < self.size and self.entry_id[row] == entry_id and self.alive[row]:
+            return row
+        return -1
+
+    def rows_of(self, entry_ids: np.ndarray) -> np.ndarray:
+        """Row slots of many entry ids at once; -1 where an id isn't live."""
+        entry_ids = np.asarray(entry_ids, dtype=np.int64)
+        if not self.size:
+            return np.full(len(entry_ids), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.entry_id[:self.size], entry_ids), self.size - 1)
+        return np.where((self.entry_id[rows] == entry_ids) & self.alive[rows], rows, -1)
+
+    def slot(self, entry_id: int) -> int:
+        """Current row slot of an entry id."""
+        row = self._find(entry_id)
+        if row < 0:
+            raise KeyError(f"Unknown entry id {entry_id}")
+        return row
+
+    def _place(self, entry_ids: np.ndarray) -> np.ndarray:
+        """Target row of each new id: its tombstoned row if it has one, else -1 (append)."""
+        if not self.size:
+            return np.full(len(entry_ids), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.entry_id[:self.size], entry_ids), self.size - 1)
+        existing = self.entry_id[rows] == entry_ids
+        if (existing & self.alive[rows]).any():
+            raise ValueError("Entry ids must not already be in the store")
+        return np.where(existing, rows, -1)
+
+    def _sort(self) -> None:
+        """Restore entry id order after ids were appended out of order."""
+        order = np.argsort(self.entry_id[:self.size], kind="stable")
+        for column in self._columns():
+            column[:self.size] = column[:self.size][order]
+
+    def _append(self, team: int, kind: int, name: str, score_before: int, score_after: int,
+                difference: int, entry_id: Optional[int] = None) -> int:
+        if entry_id is None:
+            entry_id = self.next_id
+        self.next_id = max(self.next_id, entry_id + 1)
+        if self.size and entry_id <= self.entry_id[self.size - 1]:
+            # A restore: rare, so it goes through the batch path.
+            names = np.empty(1, dtype=object)
+            names[0] = name
+            self._insert(np.array([entry_id]), np.array([team]), np.array([kind]), names,
+                         np.array([score_before]), np.array([score_after]), np.array([difference]))
+            return entry_id
+        self._reserve(1)
+        row = self.size
+        self.entry_id[row] = entry_id
+        self.alive[row] = True
+        self.team[row] = team
+        self.kind[row] = kind
+        self.name[row] = name
+        self.score_before[row] = score_before
+        self.score_after[row] = score_after
+        self.difference[row] = difference
+        self.size += 1
+        return entry_id
+
+    def add_player(self, team: int, name: str, score_before: int, score_after: int,
+                   entry_id: Optional[int] = None) -> int:
+        """Append a player row and return its entry id."""
+        entry_id = self._append(team, PLAYER, name, score_before, score_after, score_after - score_before, entry_id)
+        self.aggregates[team].add_player(score_before, score_after)
+        self.leaderboards[team].add(entry_id, score_after - score_before)
+        return entry_id
+
+    def add_penalty(self, team: int, name: str, amount: int, entry_id: Optional[int] = None) -> int:
+        """Append a penalty row (stored as a negative difference) and return its entry id."""
+        entry_id = self._append(team, PENALTY, name, 0, 0, -amount, entry_id)
+        self.aggregates[team].add_penalty(-amount)
+        return entry_id
+
+    def delete(self, entry_id: int) -> None:
+        """Delete an entry by id in O(log n) amortized time."""
+        row = self.slot(entry_id)
+        team = int(self.team[row])
+        if self.kind[row] == PLAYER:
+            self.aggregates[team].remove_player(int(self.score_before[row]), int(self.score_after[row]))
+            self.leaderboards[team].remove(entry_id, int(self.difference[row]))
+        else:
+            self.aggregates[team].remove_penalty(int(self.difference[row]))
+        self.alive[row] = False
+        self.name[row] = None
+        self.dead += 1
+        if self.dead > max(self.size - self.dead, 32):
+            self._compact()
+
+    def _insert(self, entry_ids: np.ndarray, team: np.ndarray, kind: np.ndarray, name: np.ndarray,
+                score_before: np.ndarray, score_after: np.ndarray, difference: np.ndarray) -> None:
+        """Write a batch of rows, keeping the columns in entry id order.
+
+        Ids above every id in the store are appended with slice writes;
+        tombstoned ids are revived in place; anything else is appended and
+        the rows re-sorted.
+        """
+        count = len(entry_ids)
+        start = self.size
+        in_order = (not start or entry_ids[0] > self.entry_id[start - 1]) and bool((np.diff(entry_ids) > 0).all())
+        if in_order:
+            rows, added = slice(start, start + count), count
+        else:
+            rows = self._place(entry_ids)
+            appended = rows < 0
+            added = int(appended.sum())
+            rows[appended] = np.arange(start, start + added)
+            self.dead -= count - added
+        self._reserve(added)
+        self.entry_id[rows] = entry_ids
+        self.alive[rows] = True
+        self.team[rows] = team
+        self.kind[rows] = kind
+        self.name[rows] = name
+        self.score_before[rows] = score_before
+        self.score_after[rows] = score_after
+        self.difference[rows] = difference
+        self.size = start + added
+        if not in_order:
+            self._sort()
+        self.next_id = max(self.next_id, int(entry_ids.max()) + 1)
+
+    def extend(self, entry_ids: np.ndarray, team: np.ndarray, kind: np.ndarray, name: np.ndarray,
+               score_before: np.ndarray, score_after: np.ndarray, difference: np.ndarray) -> None:
+        """Add a batch of rows with known entry ids in one vectorized pass."""
+        if not len(entry_ids):
+            return
+        entry_ids = np.asarray(entry_ids, dtype=np.int64)
+        team, kind = np.asarray(team), np.asarray(kind)
+        score_before, score_after = np.asarray(score_before), np.asarray(score_after)
+        difference = np.asarray(difference)
+        self._insert(entry_ids, team, kind, name, score_before, score_after, difference)
+        for team_id, aggregate in enumerate(self.aggregates):
+            players = (team == team_id) & (kind == PLAYER)
+            self.leaderboards[team_id].add_many(entry_ids[players], difference[players])
+            penalties = (team == team_id) & (kind == PENALTY)
+            aggregate.add_totals(
+                int(players.sum()),
+                int(score_before[players].sum()),
+                int(score_after[players].sum()),
+                int(penalties.sum()),
+                int(difference[penalties].sum()),
+            )
+
+    def apply_changes(self, changes: Sequence[Tuple[int, int, int, str, int, int, int, int, int]], rev: int) -> int:
+        """Apply database change rows (see stomp.db.changes_since) and return the newest revision.
+
+        Each entry id appears at most once in a change set, with its latest
+        state, so deletes and inserts can be applied as two batches.
+        """
+        if not changes:
+            return rev
+        entry_ids, team, kind, name, before, after, difference, deleted, revs = (
+            np.array(column) for column in zip(*changes)
+        )
+        known = self.rows_of(entry_ids) >= 0
+        for entry_id in entry_ids[known & (deleted != 0)].tolist():
+            self.delete(entry_id)
+        new = ~known & (deleted == 0)
+        name_column = np.empty(len(name), dtype=object)
+        name_column[:] = name
+        self.extend(entry_ids[new], team[new], kind[new], name_column[new], before[new], after[new], difference[new])
+        return max(rev, int(revs.max()))
+
+    def to_snapshot(self) -> bytes:
+        """Serialize the live rows as a compact .npz blob."""
+        live = np.flatnonzero(self.alive[:self.size])
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            entry_id=self.entry_id[live],
+            team=self.team[live],
+            kind=self.kind[live],
+            name=np.array(self.name[live].tolist(), dtype=str),
+            score_before=self.score_before[live],
+            score_after=self.score_after[live],
+            difference=self.difference[live],
+            next_id=np.array(self.next_id),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_snapshot(cls, data: bytes) -> "EntryStore":
+        """Rebuild a store from a to_snapshot blob."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as snapshot:
+            store = cls(capacity=max(64, len(snapshot["entry_id"])))
+            name = np.empty(len(snapshot["name"]), dtype=object)
+            name[:] = snapshot["name"].tolist()
+            store.extend(
+                snapshot["entry_id"], snapshot["team"], snapshot["kind"], name,
+                snapshot["score_before"], snapshot["score_after"], snapshot["difference"],
+            )
+            store.next_id = max(store.next_id, int(snapshot["next_id"]))
+        return store
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows (the survivors stay in entry id order)."""
+        keep = np.flatnonzero(self.alive[:self.size])
+        live = len(keep)
+        for column in self._columns():
+            column[:live] = column[keep]
+        self.name[live:self.size] = None
+        self.alive[live:self.size] = False
+        self.size = live
+        self.dead = 0
+
+    def team_rows(self, team: int) -> np.ndarray:
+        """Row slots for a team: players first, then penalties, each in insertion order."""
+        rows = np.flatnonzero(self.alive[:self.size] & (self.team[:self.size] == team))
+        return rows[np.argsort(self.kind[rows], kind="stable")]
+
+    def team_frame(self, team: int, rows: Optional[np.ndarray] = None, with_total: bool = True) -> "pd.DataFrame":
+        """Build a display frame for a team with nullable integer score columns."""
+        # pandas is only needed once a table is rendered, so it isn't
+        # imported at module load and doesn't slow down the first paint.
+        import pandas as pd
+        if rows is None:
+            rows = self.team_rows(team)
+        names = self.name[rows]
+        before = self.score_before[rows]
+        after = self.score_after[rows]
+        difference = self.difference[rows]
+        missing = self.kind[rows] == PENALTY
+        if with_total:
+            aggregate = self.aggregates[team]
+            names = np.append(names, "TOTAL")
+            before = np.append(before, aggregate.score_before)
+            after = np.append(after, aggregate.score_after)
+            difference = np.append(difference, aggregate.total)
+            missing = np.append(missing, False)
+        return pd.DataFrame({
+            "Name": names,
+            "Score Before": pd.arrays.IntegerArray(before, missing),
+            "Score After": pd.arrays.IntegerArray(after, missing.copy()),
+            "Difference": difference,
+        }, copy=False)
+
+    def entry_name(self, entry_id: int) -> str:
+        """Name of a live entry."""
+        return self.name[self.slot(entry_id)]
+
+    def total_frame(self, team: int) -> "pd.DataFrame":
+        """A single TOTAL row for a team, read from its running aggregate."""
+        import pandas as pd
+        aggregate = self.aggregates[team]
+        return pd.DataFrame({
+            "Name": ["TOTAL"],
+            "Score Before": [aggregate.score_before],
+            "Score After": [aggregate.score_after],
+            "Difference": [aggregate.total],
+        })
+
+    def _player_rows(self, team: Optional[int] = None) -> np.ndarray:
+        """Row slots of the live players, of one team or of both."""
+        players = self.alive[:self.size] & (self.kind[:self.size] == PLAYER)
+        if team is not None:
+            players &= self.team[:self.size] == team
+        return np.flatnonzero(players)
+
+    def _leaderboard(self, team: int) -> Leaderboard:
+        """A team's leaderboard, refilled from the columns if a delete left it short."""
+        leaderboard = self.leaderboards[team]
+        if leaderboard.stale:
+            rows = self._player_rows(team)
+            leaderboard.refill(self.entry_id[rows], self.difference[rows])
+        return leaderboard
+
+    def top_players(self, team: int, k: int = 3) -> List[Tuple[int, int]]:
+        """A team's k best players by Difference as (entry_id, difference) pairs."""
+        if k <= CAPACITY:
+            return self._leaderboard(team).top(k)
+        rows = self._player_rows(team)
+        rows = rows[best_indices(self.entry_id[rows], self.difference[rows], k)]
+        return list(zip(self.entry_id[rows].tolist(), self.difference[rows].tolist()))
+
+    def overall_top_players(self, k: int = 3) -> List[Tuple[int, int, int]]:
+        """The k best players across both teams as (team, entry_id, difference)."""
+        if k <= CAPACITY:
+            return merged_top([self._leaderboard(team) for team in range(len(TEAM_NAMES))], k)
+        rows = self._player_rows()
+        rows = rows[best_indices(self.entry_id[rows], self.difference[rows], k)]
+        return list(zip(self.team[rows].tolist(), self.entry_id[rows].tolist(), self.difference[rows].tolist()))
@@ -0,0 +1,16 @@
+import os
+import pytest
+import stomp.db
+from stomp.db import GameDatabase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A GameDatabase in a temporary STOMP_DB_PATH, also returned by get_database()."""
+    path = str(tmp_path / "stomp_counter.db")
+    monkeypatch.setenv("STOMP_DB_PATH", path)
+    database = GameDatabase(path)
+    monkeypatch.setattr(stomp.db, "_database", database)
+    yield database
+    database.conn.close()
@@ -0,0 +1,71 @@
+"""Bulk import validation and the export round trip."""
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from stomp.bulk_io import export_bytes, iter_import_chunks, running_totals, validate_chunk
+from stomp.store import EntryStore, PLAYER, PENALTY
+
+def filled_store() -> EntryStore:
+    store = EntryStore()
+    store.add_player(0, "Ann", 10, 25)
+    store.add_player(0, "TOTAL", 3, 4)  # a player who happens to be called TOTAL
+    store.add_penalty(0, "foul", 5)
+    store.add_player(1, "Bob", 0, 7)
+    store.add_penalty(1, "late", 2)
+    store.add_player(1, "Cy", 1, 1)
+    return store
+
+def import_rows(data: bytes, filename: str, chunk_rows: int):
+    rows, rejected, totals = [], 0, running_totals()
+    for chunk in iter_import_chunks(io.BytesIO(data), filename, chunk_rows):
+        chunk_rows_, chunk_rejected = validate_chunk(chunk, totals)
+        rows += chunk_rows_
+        rejected += chunk_rejected
+    return rows, rejected
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 100])
+def test_export_round_trip_skips_only_the_exported_totals(chunk_rows):
+    rows, rejected = import_rows(export_bytes(filled_store(), "CSV"), "export.csv", chunk_rows)
+    assert rejected == 0
+    assert rows == [
+        (0, PLAYER, "Ann", 10, 25, 15),
+        (0, PLAYER, "TOTAL", 3, 4, 1),
+        (0, PENALTY, "foul", 0, 0, -5),
+        (1, PLAYER, "Bob", 0, 7, 7),
+        (1, PLAYER, "Cy", 1, 1, 0),
+        (1, PENALTY, "late", 0, 0, -2),
+    ]
+
+def test_export_round_trip_parquet():
+    pytest.importorskip("pyarrow")
+    rows, rejected = import_rows(export_bytes(filled_store(), "Parquet"), "export.parquet", 2)
+    assert rejected == 0 and len(rows) == 6
+
+def test_total_rows_that_do_not_add_up_are_validated_like_players():
+    chunk = pd.DataFrame({
+        "Team": ["Team 1", "Team 1", "Team 1", "Team 2"],
+        "Name": ["Ann", "TOTAL", "TOTAL", "TOTAL"],
+        "Score Before": [1, 5, 9, None],
+        "Score After": [2, 6, 3, None],
+        "Difference": [1, 1, -6, 0],
+    })
+    rows, rejected = validate_chunk(chunk)
+    assert rows == [(0, PLAYER, "Ann", 1, 2, 1), (0, PLAYER, "TOTAL", 5, 6, 1)]
+    assert rejected == 2
+
+def test_validate_chunk_applies_the_input_rules():
+    chunk = pd.DataFrame({
+        "Team": ["Team 1", "2", "Team 3", "Team 1", "Team 1", "Team 2", "Team 2", "Team 1", "Team 2"],
+        "Name": ["ok", " padded ", "bad team", "", "backwards", "negative", "fraction", "penalty", "bad penalty"],
+        "Score Before": [1, 0, 1, 1, 5, -1, 1.5, np.nan, np.nan],
+        "Score After": [3, 0, 2, 2, 4, 0, 2, np.nan, np.nan],
+        "Difference": [0, 0, 0, 0, 0, 0, 0, -4, 3],
+    })
+    rows, rejected = validate_chunk(chunk)
+    assert rows == [(0, PLAYER, "ok", 1, 3, 2), (1, PLAYER, "padded", 0, 0, 0), (0, PENALTY, "penalty", 0, 0, -4)]
+    assert rejected == 6
+
+def test_validate_chunk_needs_team_and_name_columns():
+    with pytest.raises(ValueError, match="Missing column"):
+        validate_chunk(pd.DataFrame({"Name": ["x"]}))
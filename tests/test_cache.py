@@ -0,0 +1,60 @@
+"""The shared LRU caches: count, size and age limits, and content hashing."""
+import numpy as np
+import utils.cache as cache
+from utils.cache import LRUCache, content_hash, estimate_size
+
+def test_least_recently_used_entry_is_evicted_first():
+    lru = LRUCache("test", max_entries=3)
+    for key in "abc":
+        lru.put(key, key)
+    assert lru.get("a") == "a"  # now b is the least recently used
+    lru.put("d", "d")
+    assert lru.get("b") is None
+    assert [lru.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert len(lru) == 3 and lru.evictions == 1
+
+def test_total_size_is_bounded():
+    lru = LRUCache("test", max_bytes=3000)
+    for key in range(4):
+        lru.put(key, np.zeros(100))  # 800 bytes each
+    assert len(lru) == 3 and lru.total_bytes == 2400
+    assert lru.get(0) is None
+    lru.put("big", np.zeros(1000))  # larger than the whole cache: not stored
+    assert lru.get("big") is None and len(lru) == 3
+
+def test_replacing_a_key_updates_its_size():
+    lru = LRUCache("test")
+    lru.put("a", np.zeros(10))
+    lru.put("a", np.zeros(20))
+    assert len(lru) == 1 and lru.total_bytes == 160 and lru.evictions == 0
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache("test", ttl=10)
+    lru.put("a", 1)
+    now[0] += 5
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    now[0] += 6  # a expired, b hasn't
+    assert lru.get("a") is None and lru.get("b") == 2
+    now[0] += 5
+    lru.put("c", 3)  # expired entries are dropped on insert
+    assert len(lru) == 1 and lru.total_bytes == estimate_size(3)
+
+def test_get_or_compute_only_computes_on_a_miss():
+    lru = LRUCache("test")
+    calls = []
+    compute = lambda: calls.append(1) or "value"
+    assert lru.get_or_compute("k", compute) == lru.get_or_compute("k", compute) == "value"
+    assert len(calls) == 1
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"], stats["hit rate"]) == (1, 1, 0.5)
+
+def test_content_hash_depends_on_dtype_shape_and_data():
+    values = np.arange(6, dtype=np.float64)
+    assert content_hash(values) == content_hash(values.copy())
+    assert content_hash(values) != content_hash(values.astype(np.float32))
+    assert content_hash(values) != content_hash(values.reshape(2, 3))
+    assert content_hash(values[::2]) == content_hash(np.array([0.0, 2.0, 4.0]))
+    assert content_hash("1\n2") == content_hash(b"1\n2")
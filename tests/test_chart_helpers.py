@@ -0,0 +1,18 @@
+"""Min/max downsampling of streamed series for the charts."""
+import numpy as np
+import pytest
+from utils.chart_helpers import min_max_indices, stream_min_max
+from utils.streaming_stats import iter_chunks
+
+@pytest.mark.parametrize("length, block, buckets", [(10_007, 333, 97), (10_000, 100, 100), (5000, 4999, 7)])
+def test_stream_min_max_matches_min_max_indices(length, block, buckets):
+    values = np.random.default_rng(7).standard_normal(length)
+    indices, kept = stream_min_max(iter_chunks(values, block), length, buckets)
+    np.testing.assert_array_equal(indices, min_max_indices(values, buckets))
+    np.testing.assert_array_equal(kept, values[indices])
+
+def test_stream_min_max_keeps_short_streams_whole():
+    values = np.arange(10.0)
+    indices, kept = stream_min_max(iter_chunks(values, 3), len(values), 5)
+    np.testing.assert_array_equal(indices, np.arange(10))
+    np.testing.assert_array_equal(kept, values)
@@ -0,0 +1,48 @@
+"""The shared SQLite game store: revisions, syncing sessions and durability."""
+import threading
+from stomp.db import GameDatabase
+from stomp.store import PLAYER, PENALTY
+
+def test_sessions_sync_through_changes_since(database):
+    first, rev_a = database.state_at("g")
+    second, rev_b = database.state_at("g")
+    (entry_id,) = database.add_entries("g", [(0, PLAYER, "x", 1, 4, 3)])
+    rev_b = second.apply_changes(database.changes_since("g", rev_b), rev_b)
+    database.delete_entries("g", [entry_id])
+    rev_a = first.apply_changes(database.changes_since("g", rev_a), rev_a)
+    rev_b = second.apply_changes(database.changes_since("g", rev_b), rev_b)
+    assert rev_a == rev_b == 2
+    assert len(first) == len(second) == 0
+    assert first.aggregate(0).total == second.aggregate(0).total == 0
+
+def test_entries_survive_reopening_the_database(database):
+    ids = database.add_entries("g", [(0, PLAYER, "a", 1, 3, 2), (1, PENALTY, "foul", 0, 0, -4)])
+    database.delete_entries("g", ids[:1])
+    reopened = GameDatabase(database.path)
+    store, rev = reopened.state_at("g")
+    assert rev == 3 and len(store) == 1 and ids[1] in store
+    assert store.aggregate(1).total == -4
+    reopened.conn.close()
+
+def test_games_are_separate_and_ids_are_unique(database):
+    first = database.add_entries("g", [(0, PLAYER, "a", 0, 1, 1)])
+    second = database.add_entries("h", [(0, PLAYER, "b", 0, 2, 2), (1, PLAYER, "c", 0, 3, 3)])
+    assert len(set(first + second)) == 3
+    assert [row[0] for row in database.changes_since("g", 0)] == first
+    assert [row[-1] for row in database.changes_since("h", 0)] == [1, 2]
+    assert database.changes_since("h", 2) == []
+
+def test_concurrent_writers_get_distinct_revisions(database):
+    def add(worker: int) -> None:
+        for index in range(20):
+            database.add_entries("g", [(worker % 2, PLAYER, f"{worker}-{index}", 0, 1, 1)])
+
+    threads = [threading.Thread(target=add, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    revisions = [row[-1] for row in database.changes_since("g", 0)]
+    assert revisions == list(range(1, 81))
+    store, _ = database.state_at("g")
+    assert len(store) == 80 and store.aggregate(0).total + store.aggregate(1).total == 80
@@ -0,0 +1,94 @@
+"""File input: server path confinement, data directory pruning and memory-mapped reads."""
+import os
+import time
+import numpy as np
+import pytest
+import utils.file_input as file_input
+from utils.file_input import describe_file, open_numbers, prune_data_dir, resolve_server_path
+
+@pytest.fixture
+def server_dir(tmp_path, monkeypatch):
+    root = tmp_path / "server"
+    (root / "data").mkdir(parents=True)
+    (root / "data" / "values.npy").write_bytes(b"")
+    (tmp_path / "secret.npy").write_bytes(b"")
+    monkeypatch.setenv("CHART_SERVER_DIR", str(root))
+    monkeypatch.setattr(file_input, "SERVER_DIR", str(root))
+    return root
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    path.mkdir()
+    monkeypatch.setattr(file_input, "DATA_DIR", str(path))
+    return path
+
+def test_server_paths_resolve_inside_the_server_dir(server_dir):
+    expected = os.path.realpath(server_dir / "data" / "values.npy")
+    assert resolve_server_path("data/values.npy") == expected
+    assert resolve_server_path("data/../data/values.npy") == expected
+    assert resolve_server_path(str(server_dir / "data" / "values.npy")) == expected
+
+@pytest.mark.parametrize("path", ["../secret.npy", "data/../../secret.npy", "/etc/passwd"])
+def test_server_paths_outside_the_server_dir_are_refused(server_dir, path):
+    with pytest.raises(ValueError, match="Only files under"):
+        resolve_server_path(path)
+
+def test_symlinks_out_of_the_server_dir_are_refused(server_dir):
+    (server_dir / "link.npy").symlink_to(server_dir.parent / "secret.npy")
+    with pytest.raises(ValueError, match="Only files under"):
+        resolve_server_path("link.npy")
+
+def test_a_sibling_with_the_same_prefix_is_outside(server_dir):
+    (server_dir.parent / "server2").mkdir()
+    with pytest.raises(ValueError, match="Only files under"):
+        resolve_server_path("../server2/x.npy")
+
+def test_server_paths_are_refused_without_a_server_dir(monkeypatch):
+    monkeypatch.setattr(file_input, "SERVER_DIR", None)
+    with pytest.raises(ValueError, match="not enabled"):
+        resolve_server_path("values.npy")
+
+def write_copy(directory, name: str, size: int, age: float) -> str:
+    path = directory / name
+    path.write_bytes(b"\0" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return str(path)
+
+def test_prune_drops_old_copies_then_the_least_recently_used(data_dir, monkeypatch):
+    monkeypatch.setattr(file_input, "DATA_MAX_AGE", 100)
+    monkeypatch.setattr(file_input, "DATA_MAX_BYTES", 250)
+    expired = write_copy(data_dir, "upload-old.npy", 10, 200)
+    oldest = write_copy(data_dir, "column-a.npy", 100, 50)
+    newer = write_copy(data_dir, "upload-b.npy", 100, 10)
+    keep = write_copy(data_dir, "upload-c.npy", 100, 500)  # the file just written, whatever its age
+    other = write_copy(data_dir, "notes.txt", 1000, 500)  # not ours
+    prune_data_dir(keep=keep)
+    assert sorted(os.listdir(data_dir)) == ["notes.txt", "upload-b.npy", "upload-c.npy"]
+    assert not os.path.exists(expired) and not os.path.exists(oldest)
+    assert os.path.exists(newer) and os.path.exists(other)
+
+def test_files_are_memory_mapped_as_float64(tmp_path, data_dir):
+    values = np.arange(5, dtype=np.float64)
+    np.save(tmp_path / "values.npy", values)
+    values.astype("<f8").tofile(tmp_path / "values.f64")
+    (tmp_path / "values.csv").write_text("a,b\n1,10\n2,\n3,30\n")
+    np.testing.assert_array_equal(open_numbers(describe_file(str(tmp_path / "values.npy"))), values)
+    raw = open_numbers(describe_file(str(tmp_path / "values.f64")))
+    assert isinstance(raw, np.memmap) and not raw.flags.writeable
+    np.testing.assert_array_equal(raw, values)
+    column = open_numbers(describe_file(str(tmp_path / "values.csv"), "b"))
+    np.testing.assert_array_equal(column, [10.0, 30.0])
+    with pytest.raises(ValueError, match="Unknown column"):
+        open_numbers(describe_file(str(tmp_path / "values.csv"), "c"))
+
+def test_bad_files_are_reported(tmp_path, data_dir):
+    (tmp_path / "odd.bin").write_bytes(b"\0" * 12)
+    with pytest.raises(ValueError, match="multiple of 8"):
+        open_numbers(describe_file(str(tmp_path / "odd.bin")))
+    np.save(tmp_path / "table.npy", np.zeros((2, 2)))
+    with pytest.raises(ValueError, match="one-dimensional"):
+        open_numbers(describe_file(str(tmp_path / "table.npy")))
+    with pytest.raises(ValueError, match="File not found"):
+        describe_file(str(tmp_path / "missing.npy"))
@@ -0,0 +1,88 @@
+"""Background jobs: progress, cancellation, collection and context propagation."""
+import os
+import threading
+import time
+import pytest
+from utils.jobs import JobCancelled, cancel_job, get_job, pop_job, submit_job, wait_job
+from utils.math_operations import generate_sequence
+from utils.streaming_stats import checking_blocks, summarize
+from utils.tracing import start_recording, stop_recording, traced
+
+APP = os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py")
+
+def test_finished_job_is_collected_once():
+    def work(job, value):
+        job.report(0.5, "Halfway")
+        return value * 2
+
+    job_id = submit_job(work, 21)
+    assert wait_job(job_id, 5)
+    job = pop_job(job_id)
+    assert job.result() == 42 and job.progress == 0.5 and job.message == "Halfway"
+    assert pop_job(job_id) is None and get_job(job_id) is None
+
+def test_running_job_is_not_collected_and_cancel_stops_it_between_blocks():
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        with checking_blocks(job.check):
+            return summarize(generate_sequence(0, 1, 10**9, "random", seed=0))
+
+    job_id = submit_job(work)
+    job = get_job(job_id)
+    assert started.wait(5)
+    assert pop_job(job_id) is None  # still running
+    cancel_job(job_id)
+    assert get_job(job_id) is None
+    with pytest.raises(JobCancelled):
+        job.future.result(timeout=5)
+    assert job.cancelled
+
+def test_job_exception_is_raised_on_collect():
+    def work(job):
+        raise ValueError("bad input")
+
+    job_id = submit_job(work)
+    wait_job(job_id, 5)
+    with pytest.raises(ValueError, match="bad input"):
+        pop_job(job_id).result()
+
+def test_spans_recorded_in_a_job_reach_the_submitting_recorder():
+    @traced("inside job")
+    def work(job):
+        return threading.get_ident()
+
+    recorder = start_recording("test")
+    try:
+        job_id = submit_job(work)
+        wait_job(job_id, 5)
+        thread = pop_job(job_id).result()
+    finally:
+        stop_recording()
+    assert [(span.name, span.thread, span.depth) for span in recorder.spans] == [("inside job", thread, 0)]
+
+def test_changing_the_chart_after_a_calculation_redraws_it_in_a_job():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.text_area[0].input("1\n2\n3")
+    [button for button in at.button if button.label == "Calculate and Plot"][0].click()
+    at.run()
+    for _ in range(100):
+        if not at.session_state.job_id:
+            break
+        time.sleep(0.05)
+        at.run()
+    assert at.session_state.figure_key[2] == "Line Chart"
+    [box for box in at.selectbox if box.label == "Select Chart Type"][0].set_value("Bar Chart")
+    at.run()
+    for _ in range(100):
+        if not at.session_state.job_id:
+            break
+        time.sleep(0.05)
+        at.run()
+    assert not at.exception
+    assert at.session_state.figure_key[2] == "Bar Chart"
+    assert at.session_state.figure.data[0].type == "bar"
+    assert len(at.get("plotly_chart")) == 1
@@ -0,0 +1,30 @@
+"""Products in log space: mantissa and exponent, signs, zeros and block merging."""
+import math
+import numpy as np
+import pytest
+from utils.streaming_stats import LogProduct, iter_chunks
+
+@pytest.mark.parametrize("values", [
+    [2.0, -3.0, 0.5],
+    [-1.5, -2.0, -4.0],
+    [-1.5, -2.0],
+    [1e-300, 7.0, 3e-12],
+])
+def test_log_product_matches_numpy(values):
+    mantissa, exponent = LogProduct.from_block(np.array(values)).result()
+    assert 1 <= abs(mantissa) < 10
+    assert mantissa * 10.0**exponent == pytest.approx(np.prod(values), rel=1e-12)
+
+def test_log_product_merges_blocks_and_does_not_overflow():
+    values = np.random.default_rng(5).uniform(-1e100, 1e100, 1000)
+    product = LogProduct.from_chunks(iter_chunks(values, 64))
+    mantissa, exponent = product.result()
+    with np.errstate(over="ignore"):
+        assert np.isinf(np.prod(values))
+    assert exponent + math.log10(abs(mantissa)) == pytest.approx(np.log10(np.abs(values)).sum(), rel=1e-12)
+    assert (mantissa < 0) == bool(np.count_nonzero(values < 0) % 2)
+
+def test_log_product_zero_nan_and_empty():
+    assert LogProduct.from_block(np.array([5.0, 0.0, -2.0])).result() == (0.0, 0)
+    assert math.isnan(LogProduct.from_chunks([np.array([1.0, 0.0]), np.array([np.nan])]).result().mantissa)
+    assert LogProduct().result() == (1.0, 0)
@@ -0,0 +1,40 @@
+"""Parsing the text input: the bulk path and the per-line error report."""
+import numpy as np
+import pytest
+from utils.math_operations import MAX_REPORTED_LINES, parse_numbers, validate_numbers
+
+@pytest.mark.parametrize("text, expected", [
+    ("1\n2.5\n-3e2", [1.0, 2.5, -300.0]),
+    ("  4 \n\n5\n\n", [4.0, 5.0]),
+    ("7", [7.0]),
+    ("inf\nnan", [np.inf, np.nan]),
+])
+def test_parse_numbers_reads_one_number_per_line(text, expected):
+    valid, numbers, message = parse_numbers(text)
+    assert valid and message == ""
+    assert numbers.dtype == np.float64 and numbers.ndim == 1
+    np.testing.assert_array_equal(numbers, expected)
+
+@pytest.mark.parametrize("text, lines", [
+    ("1 2 3", "1"),
+    ("1\n2 3\n4", "2"),
+    ("1 2\n3 4", "1, 2"),
+    ("1\nabc\n\n2\nx", "2, 5"),
+    ("1,5", "1"),
+])
+def test_parse_numbers_reports_the_invalid_lines(text, lines):
+    valid, numbers, message = parse_numbers(text)
+    assert not valid and len(numbers) == 0
+    assert message == f"Please enter valid numbers (invalid line {lines})"
+
+def test_parse_numbers_caps_the_reported_lines():
+    text = "\n".join(["x"] * (MAX_REPORTED_LINES + 3))
+    _, _, message = parse_numbers(text)
+    assert message.endswith(f"{MAX_REPORTED_LINES} and 3 more)")
+
+def test_parse_numbers_rejects_empty_input():
+    assert parse_numbers(" \n\n")[::2] == (False, "Please enter some numbers")
+
+def test_validate_numbers_joins_the_lines():
+    valid, numbers, _ = validate_numbers(["1", "2"])
+    assert valid and numbers.tolist() == [1.0, 2.0]
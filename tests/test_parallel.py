@@ -0,0 +1,10 @@
+"""The worker-pool versions of the reductions, checked against NumPy."""
+import numpy as np
+import utils.parallel as parallel
+
+def test_parallel_cumsum_carries_across_ranges(monkeypatch):
+    split_ranges = parallel.split_ranges
+    monkeypatch.setattr(parallel, "split_ranges", lambda size: split_ranges(size, 4))
+    values = np.random.default_rng(6).standard_normal(10_001)
+    assert len(parallel.split_ranges(len(values))) == 4
+    np.testing.assert_allclose(parallel.parallel_cumsum(values), np.cumsum(values), rtol=1e-12, atol=1e-9)
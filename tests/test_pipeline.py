@@ -0,0 +1,38 @@
+"""Element-wise operations and fused pipelines, including the out= buffer."""
+import numpy as np
+import pytest
+import utils.parallel as parallel
+from utils import perform_math_operation, run_pipeline
+
+def test_operations_write_into_the_input_itself():
+    data = np.arange(10, dtype=np.float64)
+    assert perform_math_operation(data, "Multiply", 3, out=data) is data
+    np.testing.assert_array_equal(data, np.arange(10) * 3)
+    assert run_pipeline(data, [("Add", 1), ("Cumulative Sum", 0)], out=data) is data
+    np.testing.assert_array_equal(data, np.cumsum(np.arange(10) * 3 + 1))
+
+@pytest.mark.parametrize("out", [
+    np.zeros(5, dtype=np.int64),
+    np.zeros(5, dtype=np.float32),
+    np.zeros(4),
+    np.zeros((5, 1)),
+    [0.0] * 5,
+])
+def test_unusable_out_buffers_are_rejected(out):
+    with pytest.raises(ValueError, match="out must be a float64 array"):
+        perform_math_operation(np.arange(5), "Add", 1, out=out)
+    with pytest.raises(ValueError, match="out must be a float64 array"):
+        run_pipeline(np.arange(5), [("Add", 1)], out=out)
+
+def test_read_only_out_is_rejected():
+    out = np.zeros(5)
+    out.flags.writeable = False
+    with pytest.raises(ValueError, match="writeable"):
+        perform_math_operation(np.arange(5.0), "Add", 1, out=out)
+
+def test_parallel_pipeline_matches_serial(monkeypatch):
+    data = np.random.default_rng(0).normal(size=10_000)
+    steps = [("Multiply", 2), ("Subtract", 0.5), ("Divide", 4)]
+    serial = run_pipeline(data, steps)
+    monkeypatch.setattr(parallel, "PARALLEL_THRESHOLD", 1000)
+    np.testing.assert_array_equal(run_pipeline(data, steps, out=np.empty_like(data)), serial)
@@ -0,0 +1,131 @@
+"""The columnar EntryStore: id lookup, tombstones, restores and snapshots."""
+import numpy as np
+import pytest
+from stomp.store import EntryStore, PLAYER, PENALTY
+
+def filled_store(count: int) -> EntryStore:
+    store = EntryStore()
+    for index in range(count):
+        if index % 5 == 4:
+            store.add_penalty(index % 2, f"penalty {index}", index)
+        else:
+            store.add_player(index % 2, f"player {index}", index, 2 * index)
+    return store
+
+def live_rows(store: EntryStore) -> dict:
+    """Live rows keyed by entry id, as (team, kind, name, before, after, difference)."""
+    live = np.flatnonzero(store.alive[:store.size])
+    return {
+        int(entry_id): row for entry_id, row in zip(store.entry_id[live].tolist(), zip(
+            store.team[live].tolist(), store.kind[live].tolist(), store.name[live].tolist(),
+            store.score_before[live].tolist(), store.score_after[live].tolist(), store.difference[live].tolist(),
+        ))
+    }
+
+def vars_of(aggregate) -> dict:
+    return {slot: getattr(aggregate, slot) for slot in aggregate.__slots__}
+
+def test_entry_store_compacts_tombstones():
+    store = filled_store(200)
+    expected = live_rows(store)
+    deleted = np.random.default_rng(8).choice(np.arange(1, 201), 150, replace=False).tolist()
+    for entry_id in deleted:
+        store.delete(entry_id)
+        del expected[entry_id]
+    assert store.dead < 150  # compacted along the way
+    assert len(store) == len(expected) == 50
+    assert live_rows(store) == expected
+    assert all(store.entry_id[store.slot(entry_id)] == entry_id for entry_id in expected)
+    np.testing.assert_array_equal(store.rows_of(list(expected)) >= 0, True)
+    for team in (0, 1):
+        rows = [row for row in expected.values() if row[0] == team]
+        aggregate = store.aggregate(team)
+        assert aggregate.player_count == sum(row[1] == PLAYER for row in rows)
+        assert aggregate.penalty_count == sum(row[1] == PENALTY for row in rows)
+        assert aggregate.total == sum(row[5] for row in rows)
+    with pytest.raises(KeyError):
+        store.delete(deleted[0])
+
+def test_entry_store_snapshot_round_trip():
+    store = filled_store(120)
+    for entry_id in range(1, 121, 3):
+        store.delete(entry_id)
+    restored = EntryStore.from_snapshot(store.to_snapshot())
+    assert live_rows(restored) == live_rows(store)
+    assert restored.next_id == store.next_id
+    for team in (0, 1):
+        assert vars_of(restored.aggregate(team)) == vars_of(store.aggregate(team))
+        np.testing.assert_array_equal(restored.entry_id[restored.team_rows(team)],
+                                      store.entry_id[store.team_rows(team)])
+    assert restored.add_player(0, "new", 0, 1) == store.next_id
+
+def test_entry_store_finds_ids_by_binary_search():
+    store = filled_store(10)
+    store.delete(4)
+    assert 3 in store and 4 not in store and 11 not in store and 0 not in store
+    np.testing.assert_array_equal(store.rows_of([1, 4, 10, 99]), [0, -1, 9, -1])
+    assert store.entry_name(7) == "player 6"
+    with pytest.raises(KeyError):
+        store.slot(4)
+    assert EntryStore().rows_of([1]).tolist() == [-1]
+
+def test_entry_store_restores_ids_in_place_and_in_order():
+    store = filled_store(100)
+    for entry_id in range(1, 101):
+        if entry_id % 10:
+            store.delete(entry_id)
+    store._compact()  # so restoring 3 and 55 has no tombstone to revive
+    store.add_player(1, "back", 1, 5, entry_id=3)
+    store.add_penalty(0, "late", 2, entry_id=55)
+    store.delete(20)
+    store.add_player(0, "again", 0, 1, entry_id=20)  # revives the tombstone
+    assert store.dead == 0
+    ids = store.entry_id[:store.size]
+    assert (np.diff(ids) > 0).all()
+    assert [store.entry_name(entry_id) for entry_id in (3, 20, 55)] == ["back", "again", "late"]
+    # the kept ids 10, 20, ... are all team 1 penalties; 20 came back as a team 0 player
+    assert [store.aggregate(1).player_count, store.aggregate(1).penalty_count] == [1, 9]
+    assert [store.aggregate(0).player_count, store.aggregate(0).penalty_count] == [1, 1]
+    assert store.next_id == 101
+    with pytest.raises(ValueError):
+        store.extend(np.array([3]), np.array([0]), np.array([PLAYER]), np.array(["twin"], dtype=object),
+                     np.array([0]), np.array([0]), np.array([0]))
+
+def test_entry_store_extend_sorts_an_out_of_order_batch():
+    store = filled_store(5)
+    store.delete(2)
+    name = np.array(["a", "b", "c"], dtype=object)
+    store.extend(np.array([9, 2, 7]), np.array([0, 1, 0]), np.array([PLAYER] * 3), name,
+                 np.zeros(3, dtype=np.int64), np.array([9, 2, 7]), np.array([9, 2, 7]))
+    assert store.entry_id[:store.size].tolist() == [1, 2, 3, 4, 5, 7, 9]
+    assert [store.entry_name(entry_id) for entry_id in (2, 7, 9)] == ["b", "c", "a"]
+    assert len(store) == 7 and store.dead == 0
+
+def brute_top(store: EntryStore, team, k):
+    rows = [row for row in live_rows(store).items() if row[1][1] == PLAYER and team in (None, row[1][0])]
+    rows.sort(key=lambda item: (-item[1][5], item[0]))
+    return [(row[0], entry_id, row[5]) for entry_id, row in rows[:k]]
+
+@pytest.mark.parametrize("k", [1, 3, 50, 80])
+def test_top_players_match_a_full_sort_through_deletes(k):
+    rng = np.random.default_rng(k)
+    store = EntryStore()
+    for index in range(400):
+        store.add_player(index % 2, f"p{index}", 0, int(rng.integers(0, 20)))  # plenty of ties
+    for entry_id in rng.choice(np.arange(1, 401), 250, replace=False).tolist():
+        store.delete(entry_id)
+        if entry_id % 7 == 0:
+            for team in (0, 1):
+                assert store.top_players(team, k) == [row[1:] for row in brute_top(store, team, k)]
+    store.extend(np.arange(401, 501), np.arange(100) % 2, np.full(100, PLAYER), np.full(100, "b", dtype=object),
+                 np.zeros(100, dtype=np.int64), rng.integers(0, 30, 100), rng.integers(0, 30, 100))
+    for team in (0, 1):
+        assert store.top_players(team, k) == [row[1:] for row in brute_top(store, team, k)]
+    assert store.overall_top_players(k) == brute_top(store, None, k)
+
+def test_leaderboards_stay_bounded():
+    store = EntryStore()
+    for index in range(1000):
+        store.add_player(0, "p", 0, index)
+    assert len(store.leaderboards[0].keys) == 50 and len(store.leaderboards[0]) == 1000
+    assert store.top_players(0, 2) == [(1000, 999), (999, 998)]
@@ -0,0 +1,67 @@
+"""The one-pass statistics engine (RunningStats, KLLSketch, calculate_statistics) checked against NumPy."""
+import numpy as np
+import pytest
+from utils import calculate_statistics
+from utils.math_operations import generate_sequence
+from utils.streaming_stats import KLLSketch, RunningStats, iter_chunks
+
+def rank_error(sketch: KLLSketch, values: np.ndarray, q: float) -> float:
+    """How far the sketch's q-quantile is from rank q in the sorted values, as a fraction."""
+    rank = np.searchsorted(np.sort(values), sketch.quantile(q), side="left") / len(values)
+    return abs(rank - q)
+
+def total_weight(sketch: KLLSketch) -> int:
+    return sum(len(items) * 2**level for level, items in enumerate(sketch.levels))
+
+def test_kll_is_exact_before_compaction():
+    values = np.random.default_rng(1).standard_normal(150)
+    sketch = KLLSketch(k=200).update(values)
+    assert len(sketch.levels) == 1
+    for q in (0.0, 0.1, 0.5, 0.9, 1.0):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q))
+
+def test_kll_compaction_keeps_weight_and_rank_accuracy():
+    values = np.random.default_rng(2).standard_normal(200_000)
+    sketch = KLLSketch(k=200, seed=0)
+    for block in iter_chunks(values, 4096):
+        sketch.update(block)
+    assert len(sketch.levels) > 1
+    assert sketch.count == len(values) == total_weight(sketch)
+    assert sum(len(items) for items in sketch.levels) < 2000
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert rank_error(sketch, values, q) < 0.02
+
+def test_kll_merge_matches_the_combined_data():
+    rng = np.random.default_rng(3)
+    left, right = rng.standard_normal(60_000), rng.uniform(-1, 5, 90_000)
+    merged = KLLSketch(k=200, seed=0).update(left).merge(KLLSketch(k=200, seed=1).update(right))
+    combined = np.concatenate([left, right])
+    assert merged.count == len(combined) == total_weight(merged)
+    for q in (0.1, 0.5, 0.9):
+        assert rank_error(merged, combined, q) < 0.02
+
+def test_chan_merge_matches_numpy():
+    rng = np.random.default_rng(4)
+    values = np.concatenate([rng.normal(1e6, 1.0, 5000), rng.normal(-3.0, 50.0, 7)])
+    stats = RunningStats()
+    for start, stop in [(0, 1), (1, 1), (1, 2500), (2500, 5003), (5003, len(values))]:
+        stats.merge(RunningStats.from_block(values[start:stop]))
+    assert stats.count == len(values)
+    assert stats.total == pytest.approx(values.sum())
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance == pytest.approx(values.var(), rel=1e-9)
+    assert (stats.minimum, stats.maximum) == (values.min(), values.max())
+
+@pytest.mark.parametrize("values", [np.arange(1.0, 202.0), list(range(1, 1001)), [3.0, -1.0, 2.0, 10.0]])
+def test_calculate_statistics_in_memory_median_is_exact(values):
+    statistics = calculate_statistics(values)
+    assert statistics["Median"] == np.median(values)
+    assert statistics["Mean"] == pytest.approx(np.mean(values))
+    assert statistics["Standard Deviation"] == pytest.approx(np.std(values))
+    assert (statistics["Minimum"], statistics["Maximum"]) == (np.min(values), np.max(values))
+
+def test_calculate_statistics_labels_the_sketch_median():
+    assert calculate_statistics(generate_sequence(1, 100, 100))["Median"] == 50.5
+    statistics = calculate_statistics(generate_sequence(0, 1, 50_000, "random", seed=0))
+    assert "Median" not in statistics
+    assert statistics["Median (approx.)"] == pytest.approx(0.5, abs=0.02)
@@ -0,0 +1,30 @@
+"""Span recording across reruns, and the tracemalloc reference it holds."""
+import tracemalloc
+import pytest
+import utils.tracing as tracing
+from streamlit.testing.v1 import AppTest
+
+def traced_script():
+    import streamlit as st
+    from utils.tracing import begin_rerun, render_debug_panel, span
+
+    with begin_rerun("script") as recorder:
+        with span("work"):
+            if st.session_state.get("ending") == "error":
+                raise RuntimeError("rerun failed")
+            if st.session_state.get("ending") == "stop":
+                st.stop()
+        render_debug_panel(recorder)
+
+@pytest.mark.parametrize("ending", ["panel", "error", "stop"])
+def test_counting_traced_bytes_releases_tracemalloc_however_the_rerun_ends(ending):
+    at = AppTest.from_function(traced_script)
+    at.query_params["debug"] = "1"
+    at.session_state["trace_allocations"] = True
+    at.session_state["ending"] = ending
+    for _ in range(3):
+        at.run()
+        assert tracing._tracemalloc_users == 0
+        assert not tracemalloc.is_tracing()
+    assert bool(at.exception) == (ending == "error")
+    assert bool(at.get("download_button")) == (ending == "panel")
@@ -0,0 +1,139 @@
+import numpy as np
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple, Dict, Union
+from utils.streaming_stats import CHUNK_SIZE, RunningStats, iter_chunks, summarize
+from utils.tracing import traced
+from utils.parallel import (
+    ELEMENTWISE_UFUNCS,
+    get_executor,
+    parallel_elementwise,
+    should_parallelize,
+    split_ranges
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+def validate_numeric_input(data: str) -> Tuple[bool, List[float]]:
+    """Validate and convert string input to numeric data."""
+    try:
+        # Split input by commas and convert to float
+        numbers = [float(x.strip()) for x in data.split(',')]
+        return True, numbers
+    except ValueError:
+        return False, []
+
+@traced()
+def perform_math_operation(data: Union[List[float], np.ndarray], operation: str, value: float,
+                           out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply Add/Subtract/Multiply/Divide by a scalar to every value.
+
+    Works on NumPy arrays without building Python lists; pass out= (a
+    writeable float64 array of the input's length, which may be the input
+    itself if that is already float64) to write the result into an
+    existing buffer. Large inputs are split across the worker pool.
+    """
+    if len(data) == 0:
+        raise ValueError("No data provided")
+    _check_step(operation, value)
+    array = np.asarray(data, dtype=np.float64)
+    _check_out(array, out)
+    if operation == "Cumulative Sum":
+        return run_pipeline(array, [(operation, value)], out)
+    if should_parallelize(len(array)):
+        return parallel_elementwise(array, operation, value, out)
+    return ELEMENTWISE_UFUNCS[operation](array, value, out=out)
+
+def _check_step(operation: str, value: float) -> None:
+    if operation not in ELEMENTWISE_UFUNCS and operation != "Cumulative Sum":
+        raise ValueError(f"Unknown operation: {operation}")
+    if operation == "Divide" and value == 0:
+        raise ValueError("Division by zero is not allowed")
+
+def _check_out(array: np.ndarray, out: Optional[np.ndarray]) -> None:
+    if out is None:
+        return
+    if not isinstance(out, np.ndarray) or out.dtype != np.float64 or out.shape != array.shape:
+        raise ValueError(f"out must be a float64 array of shape {array.shape}")
+    if not out.flags.writeable:
+        raise ValueError("out must be writeable")
+
+def _run_steps(array: np.ndarray, steps: Sequence[Tuple[str, float]], out: np.ndarray,
+               start: int, stop: int, carries: List[float]) -> None:
+    """Apply every step to array[start:stop] one cache-sized block at a time."""
+    for block_start in range(start, stop, CHUNK_SIZE):
+        block_stop = min(block_start + CHUNK_SIZE, stop)
+        source = array[block_start:block_stop]
+        block = out[block_start:block_stop]
+        for index, (operation, value) in enumerate(steps):
+            if operation == "Cumulative Sum":
+                np.cumsum(source, out=block)
+                block += carries[index]
+                carries[index] = block[-1]
+            else:
+                ELEMENTWISE_UFUNCS[operation](source, value, out=block)
+            source = block
+
+@traced()
+def run_pipeline(data: Union[List[float], np.ndarray], steps: Sequence[Tuple[str, float]],
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Run a chain of operations, e.g. [("Multiply", 2), ("Add", 1), ("Cumulative Sum", 0)], as one fused pass.
+
+    Each block of the input goes through every step while it is in cache,
+    so no full-size intermediate arrays are allocated; Cumulative Sum steps
+    carry their running total from block to block. Pipelines without a
+    Cumulative Sum are split across the worker pool for large inputs.
+    out= takes the same buffers as in perform_math_operation.
+    """
+    if len(data) == 0:
+        raise ValueError("No data provided")
+    if not steps:
+        raise ValueError("No operations provided")
+    for operation, value in steps:
+        _check_step(operation, value)
+    array = np.asarray(data, dtype=np.float64)
+    _check_out(array, out)
+    if out is None:
+        out = np.empty_like(array)
+    has_carry = any(operation == "Cumulative Sum" for operation, _ in steps)
+    if should_parallelize(len(array)) and not has_carry:
+        list(get_executor().map(
+            lambda bounds: _run_steps(array, steps, out, *bounds, [0.0] * len(steps)),
+            split_ranges(len(array))
+        ))
+    else:
+        _run_steps(array, steps, out, 0, len(array), [0.0] * len(steps))
+    return out
+
+def create_dataframe(data: List[float]) -> "pd.DataFrame":
+    """Create a DataFrame with index numbers."""
+    import pandas as pd
+    return pd.DataFrame({
+        'Index': range(1, len(data) + 1),
+        'Value': data
+    })
+
+@traced()
+def calculate_statistics(data: Union[List[float], np.ndarray, Iterable[np.ndarray]]) -> Dict[str, float]:
+    """Calculate basic statistics for the data in one streaming pass.
+
+    data may be a list, an array or an iterable of array blocks (e.g.
+    utils.streaming_stats.iter_file_chunks), so inputs larger than RAM can
+    be summarized. Lists and in-memory arrays get the exact median; blocks
+    and memory-mapped files get it from a KLL sketch, which is exact only up
+    to its k (200) values and is reported as "Median (approx.)" beyond that.
+    """
+    if isinstance(data, (np.ndarray, list, tuple)) and not isinstance(data, np.memmap):
+        array = np.asarray(data, dtype=np.float64)
+        stats = RunningStats.from_chunks(iter_chunks(array))
+        median_label, median = 'Median', float(np.median(array))
+    else:
+        stats, sketch = summarize(data)
+        median_label = 'Median' if len(sketch.levels) == 1 else 'Median (approx.)'
+        median = sketch.quantile(0.5)
+    return {
+        'Mean': stats.mean,
+        median_label: median,
+        'Standard Deviation': stats.std,
+        'Minimum': stats.minimum,
+        'Maximum': stats.maximum
+    }
@@ -0,0 +1,123 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+import numpy as np
+
+def content_hash(data: Union[str, bytes, np.ndarray]) -> str:
+    """Hash text, bytes or an array's contents (with dtype and shape) without copying it."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, np.ndarray):
+        digest.update(f"{data.dtype.str}{data.shape}".encode())
+        data = np.ascontiguousarray(data)
+        digest.update(memoryview(data).cast("B"))
+    elif isinstance(data, str):
+        digest.update(data.encode())
+    else:
+        digest.update(data)
+    return digest.hexdigest()
+
+def estimate_size(value: Any) -> int:
+    """Rough size in bytes of a cached value, counting array buffers."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)) and len(value) < 16:
+        return sum(estimate_size(item) for item in value)
+    if hasattr(value, "data") and hasattr(value, "layout"):  # plotly Figure
+        return 1024 + sum(
+            estimate_size(getattr(trace, axis, None)) for trace in value.data for axis in ("x", "y")
+        )
+    return sys.getsizeof(value)
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count, total size and entry age.
+
+    Shared by every session in the process, so it is safe to hand cached
+    arrays to several sessions as long as they are treated as read-only.
+    """
+
+    def __init__(self, name: str, max_entries: int = 32, max_bytes: int = 256 * 2**20, ttl: float = 600.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: Hashable, evicted: bool = True) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+        self.evictions += evicted
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (refreshing its recency) or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert a value, evicting expired and then least recently used entries."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key, evicted=False)
+            now = time.monotonic()
+            for stale in [k for k, (_, _, expires) in self._entries.items() if expires < now]:
+                self._drop(stale)
+            while self._entries and (len(self._entries) >= self.max_entries or self.total_bytes + size > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+            self._entries[key] = (value, size, now + self.ttl)
+            self.total_bytes += size
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and caching it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "cache": self.name,
+            "entries": len(self._entries),
+            "size (MB)": round(self.total_bytes / 2**20, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+# Process-wide caches shared by all sessions of the chart maker.
+parse_cache = LRUCache("parsed input", max_entries=16, max_bytes=512 * 2**20)
+result_cache = LRUCache("operation results", max_entries=128, max_bytes=256 * 2**20)
+figure_cache = LRUCache("figures", max_entries=64, max_bytes=128 * 2**20)
+
+ALL_CACHES = [parse_cache, result_cache, figure_cache]
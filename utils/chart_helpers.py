@@ -1,45 +1,205 @@
-import plotly.graph_objects as go
-import plotly.express as px
 import numpy as np
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, Iterable, List, Dict, Any, Optional, Sequence, Tuple
+from utils.tracing import traced
+from utils.streaming_stats import iter_chunks
 
-def create_line_chart(x_data: List[float], y_data: List[float], title: str) -> go.Figure:
+# Plotly is imported inside the chart builders, so importing this module
+# (and rendering the page before any chart) doesn't pay for it.
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Default plot width in pixels; the point budget is derived from it.
+DEFAULT_CHART_WIDTH = 1200
+
+# In "auto" render mode, traces with more points than this are drawn with WebGL.
+WEBGL_THRESHOLD = 1000
+
+RENDER_MODES = ["auto", "svg", "webgl"]
+
+def lttb_indices(x: Optional[np.ndarray], y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps out of len(y).
+
+    x=None means the x values are the indices themselves, which are then
+    generated per bucket instead of materialized.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(edges)
+    if x is None:
+        mean_x = (edges[:-1] + edges[1:] - 1) / 2
+    else:
+        mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < threshold - 2:
+            next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        else:
+            next_x, next_y = (n - 1 if x is None else x[n - 1]), y[n - 1]
+        if x is None:
+            ax, bucket_x = selected, np.arange(start, end, dtype=np.float64)
+        else:
+            ax, bucket_x = x[selected], x[start:end]
+        ay = y[selected]
+        areas = np.abs((ax - next_x) * (y[start:end] - ay) - (ax - bucket_x) * (next_y - ay))
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+    return indices
+
+def min_max_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of roughly `buckets` equal buckets."""
+    n = len(y)
+    if 2 * buckets >= n or buckets < 1:
+        return np.arange(n)
+    size = -(-n // buckets)
+    full = n // size
+    starts = np.arange(full) * size
+    body = y[:full * size].reshape(full, size)
+    parts = [starts + body.argmin(axis=1), starts + body.argmax(axis=1)]
+    if full * size < n:
+        tail = y[full * size:]
+        parts.append(np.array([full * size + tail.argmin(), full * size + tail.argmax()]))
+    return np.unique(np.concatenate(parts))
+
+def stream_min_max(blocks: Iterable[np.ndarray], length: int,
+                   buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """min_max_indices for a stream of blocks with a known total length.
+
+    Keeps only the running minimum and maximum of each bucket, so the
+    stream is read once and never held in memory. Returns the kept indices
+    and their values.
+    """
+    if 2 * buckets >= length or buckets < 1:
+        values = np.concatenate(list(iter_chunks(blocks)) or [np.empty(0)])
+        return np.arange(len(values)), values
+    size = -(-length // buckets)
+    count = -(-length // size)
+    low_index = np.zeros(count, dtype=np.int64)
+    high_index = np.zeros(count, dtype=np.int64)
+    low = np.full(count, np.inf)
+    high = np.full(count, -np.inf)
+    offset = 0
+    for block in iter_chunks(blocks):
+        # Split the block where buckets end; a bucket may span several blocks.
+        cuts = np.arange(-(-offset // size) * size, offset + len(block), size) - offset
+        edges = np.concatenate(([0], cuts[cuts > 0], [len(block)]))
+        for start, stop in zip(edges[:-1], edges[1:]):
+            bucket = (offset + start) // size
+            segment = block[start:stop]
+            argmin, argmax = int(segment.argmin()), int(segment.argmax())
+            if segment[argmin] < low[bucket]:
+                low[bucket], low_index[bucket] = segment[argmin], offset + start + argmin
+            if segment[argmax] > high[bucket]:
+                high[bucket], high_index[bucket] = segment[argmax], offset + start + argmax
+        offset += len(block)
+    indices, first = np.unique(np.concatenate([low_index, high_index]), return_index=True)
+    return indices, np.concatenate([low, high])[first]
+
+@traced()
+def downsample(x_data: Optional[List[float]], y_data: List[float], method: str,
+               width: Optional[int] = DEFAULT_CHART_WIDTH) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """Reduce a series to a point budget set by the chart width.
+
+    method is "lttb" (one point per pixel) or "minmax" (min and max per
+    pixel bucket); width=None keeps every point. x_data=None plots y against
+    its index without building the index array, so a memory-mapped y is
+    only read, never copied. y_data may also be a sized iterable of blocks
+    (a GeneratedSequence) when x_data is None; it is streamed through
+    stream_min_max whatever the method, since LTTB needs random access.
+    Returns x and y as float64 arrays, so Plotly sends them as typed
+    arrays, and the figure metadata.
+    """
+    if x_data is None and not isinstance(y_data, (np.ndarray, Sequence)):
+        length = len(y_data)
+        indices, y = stream_min_max(y_data, length, length if width is None else width)
+        meta = {"downsampled": len(indices) < length, "points_shown": len(indices), "points_total": length}
+        return indices.astype(np.float64), y, meta
+    x = None if x_data is None else np.asarray(x_data, dtype=np.float64)
+    y = np.asarray(y_data, dtype=np.float64)
+    if width is None:
+        indices = np.arange(len(y))
+    elif method == "lttb":
+        indices = lttb_indices(x, y, width)
+    else:
+        indices = min_max_indices(y, width)
+    meta = {"downsampled": len(indices) < len(y), "points_shown": len(indices), "points_total": len(y)}
+    if meta["downsampled"]:
+        y = y[indices]
+        x = indices.astype(np.float64) if x is None else x[indices]
+    elif x is None:
+        x = indices.astype(np.float64)
+    return x, y, meta
+
+def scatter_trace(x: np.ndarray, y: np.ndarray, mode: str, render_mode: str,
+                  webgl_threshold: int = WEBGL_THRESHOLD) -> "go.Scatter":
+    """Build a Scatter trace, switching to Scattergl for large inputs or render_mode="webgl"."""
+    import plotly.graph_objects as go
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode: {render_mode}")
+    use_webgl = render_mode == "webgl" or (render_mode == "auto" and len(y) > webgl_threshold)
+    trace_type = go.Scattergl if use_webgl else go.Scatter
+    return trace_type(x=x, y=y, mode=mode, name='Data')
+
+@traced()
+def create_line_chart(x_data: Optional[List[float]], y_data: List[float], title: str,
+                      width: Optional[int] = DEFAULT_CHART_WIDTH, render_mode: str = "auto") -> "go.Figure":
     """Create a line chart using Plotly."""
+    import plotly.graph_objects as go
+    x_data, y_data, meta = downsample(x_data, y_data, "lttb", width)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x_data, y=y_data, mode='lines+markers', name='Data'))
+    fig.add_trace(scatter_trace(x_data, y_data, 'lines+markers', render_mode))
     fig.update_layout(
         title=title,
         xaxis_title="X Values",
         yaxis_title="Y Values",
-        template="plotly_white"
+        template="plotly_white",
+        meta=meta
     )
     return fig
 
-def create_bar_chart(x_data: List[float], y_data: List[float], title: str) -> go.Figure:
+@traced()
+def create_bar_chart(x_data: Optional[List[float]], y_data: List[float], title: str,
+                     width: Optional[int] = DEFAULT_CHART_WIDTH) -> "go.Figure":
     """Create a bar chart using Plotly."""
+    import plotly.graph_objects as go
+    x_data, y_data, meta = downsample(x_data, y_data, "minmax", width)
     fig = go.Figure()
     fig.add_trace(go.Bar(x=x_data, y=y_data, name='Data'))
     fig.update_layout(
         title=title,
         xaxis_title="X Values",
         yaxis_title="Y Values",
-        template="plotly_white"
+        template="plotly_white",
+        meta=meta
     )
     return fig
 
-def create_scatter_plot(x_data: List[float], y_data: List[float], title: str) -> go.Figure:
+@traced()
+def create_scatter_plot(x_data: Optional[List[float]], y_data: List[float], title: str,
+                        width: Optional[int] = DEFAULT_CHART_WIDTH, render_mode: str = "auto") -> "go.Figure":
     """Create a scatter plot using Plotly."""
+    import plotly.graph_objects as go
+    x_data, y_data, meta = downsample(x_data, y_data, "minmax", width)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=x_data, y=y_data, mode='markers', name='Data'))
+    fig.add_trace(scatter_trace(x_data, y_data, 'markers', render_mode))
     fig.update_layout(
         title=title,
         xaxis_title="X Values",
         yaxis_title="Y Values",
-        template="plotly_white"
+        template="plotly_white",
+        meta=meta
     )
     return fig
 
-def apply_chart_styling(fig: go.Figure) -> go.Figure:
+@traced()
+def apply_chart_styling(fig: "go.Figure") -> "go.Figure":
     """Apply consistent styling to charts."""
     fig.update_layout(
         font=dict(family="Arial", size=12),
@@ -0,0 +1,173 @@
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+import numpy as np
+from utils.cache import content_hash
+from utils.streaming_stats import CHUNK_SIZE
+
+# Uploaded files and CSV columns converted to .npy are kept here, so the
+# session only ever holds a path and a memory map, never the data itself.
+DATA_DIR = os.environ.get("CHART_DATA_DIR", os.path.join(tempfile.gettempdir(), "chart_maker"))
+
+# Copies in DATA_DIR are pruned, oldest use first, once they are older than
+# DATA_MAX_AGE seconds or together exceed DATA_MAX_BYTES.
+DATA_MAX_AGE = float(os.environ.get("CHART_DATA_MAX_AGE", 24 * 3600))
+DATA_MAX_BYTES = int(os.environ.get("CHART_DATA_MAX_BYTES", 4 * 2**30))
+
+# Files can be read straight from disk only inside this directory; without
+# it, only uploads are accepted.
+SERVER_DIR: Optional[str] = os.environ.get("CHART_SERVER_DIR") or None
+
+FILE_TYPES = ["npy", "csv", "txt", "bin", "raw", "f64"]
+
+def detect_format(path: str) -> str:
+    """'npy', 'csv' or 'raw' (headerless little-endian float64) from the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        return "npy"
+    if extension in (".csv", ".txt"):
+        return "csv"
+    return "raw"
+
+def resolve_server_path(path: str) -> str:
+    """The real path of a file given relative to (or inside) SERVER_DIR; ValueError outside it."""
+    if SERVER_DIR is None:
+        raise ValueError("Reading files from the server is not enabled")
+    root = os.path.realpath(SERVER_DIR)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Only files under {SERVER_DIR} can be read")
+    return resolved
+
+def prune_data_dir(keep: str = "") -> None:
+    """Delete copies in DATA_DIR past DATA_MAX_AGE, then the least recently used ones over DATA_MAX_BYTES."""
+    try:
+        names = os.listdir(DATA_DIR)
+    except FileNotFoundError:
+        return
+    now = time.time()
+    files = []
+    for name in names:
+        path = os.path.join(DATA_DIR, name)
+        if path == keep or not name.startswith(("upload-", "column-")):
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files) + (os.path.getsize(keep) if os.path.exists(keep) else 0)
+    for mtime, size, path in sorted(files):
+        if now - mtime <= DATA_MAX_AGE and total <= DATA_MAX_BYTES:
+            break
+        # Sessions that already mapped the file keep their view of it.
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+def _touch(path: str) -> str:
+    # mtime marks the last use, so the files in use are pruned last.
+    os.utime(path)
+    return path
+
+def save_upload(upload: BinaryIO, name: str, upload_id: str) -> str:
+    """Copy an uploaded file to DATA_DIR once and return its path."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"upload-{content_hash(upload_id)}{os.path.splitext(name)[1].lower()}")
+    if os.path.exists(path):
+        return _touch(path)
+    upload.seek(0)
+    with open(path + ".part", "wb") as handle:
+        shutil.copyfileobj(upload, handle, length=1 << 20)
+    os.replace(path + ".part", path)
+    prune_data_dir(keep=path)
+    return path
+
+def _read_header(path: str) -> Tuple[List[str], bool]:
+    import pandas as pd
+    header = pd.read_csv(path, nrows=0).columns
+    try:
+        [float(name) for name in header]
+    except ValueError:
+        return [str(name) for name in header], False
+    return [str(index) for index in range(len(header))], True
+
+def csv_columns(path: str) -> List[str]:
+    """Column names from a CSV header, or positional names if the first row is numeric."""
+    return _read_header(path)[0]
+
+def describe_file(path: str, column: str = "") -> Dict[str, Any]:
+    """Metadata for a numeric file: format, size, column and a key identifying its contents."""
+    if not os.path.isfile(path):
+        raise ValueError(f"File not found: {path}")
+    stat = os.stat(path)
+    file_format = detect_format(path)
+    return {
+        "path": path,
+        "format": file_format,
+        "column": column if file_format == "csv" else "",
+        "size": stat.st_size,
+        "key": content_hash(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{column}"),
+    }
+
+def _convert_csv(source: Dict[str, Any]) -> str:
+    """Write one CSV column to a .npy file chunk by chunk and return its path."""
+    import pandas as pd
+    target = os.path.join(DATA_DIR, f"column-{source['key']}.npy")
+    if os.path.exists(target):
+        return _touch(target)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    columns, headerless = _read_header(source["path"])
+    if source["column"] not in columns:
+        raise ValueError(f"Unknown column: {source['column']}")
+    reader = pd.read_csv(
+        source["path"], header=None if headerless else 0, usecols=[columns.index(source["column"])],
+        dtype=np.float64, chunksize=CHUNK_SIZE * 16,
+    )
+    # The row count isn't known up front, so blocks go to a raw file first
+    # and get a .npy header once the length is known.
+    count = 0
+    try:
+        with open(target + ".part", "wb") as handle:
+            for frame in reader:
+                # Empty cells are skipped, like blank lines in the text input.
+                values = frame.iloc[:, 0].dropna().to_numpy(dtype=np.float64)
+                handle.write(values.tobytes())
+                count += len(values)
+    except ValueError as error:
+        os.remove(target + ".part")
+        raise ValueError(f"Column {source['column']} contains non-numeric values") from error
+    with open(target + ".tmp", "wb") as handle:
+        np.lib.format.write_array_header_1_0(
+            handle, {"descr": "<f8", "fortran_order": False, "shape": (count,)}
+        )
+        with open(target + ".part", "rb") as raw:
+            shutil.copyfileobj(raw, handle, length=1 << 20)
+    os.remove(target + ".part")
+    os.replace(target + ".tmp", target)
+    prune_data_dir(keep=target)
+    return target
+
+def open_numbers(source: Dict[str, Any]) -> np.ndarray:
+    """A read-only, memory-mapped float64 array over the file described by source."""
+    try:
+        if source["format"] == "csv":
+            numbers = np.load(_convert_csv(source), mmap_mode="r")
+        elif source["format"] == "npy":
+            numbers = np.load(source["path"], mmap_mode="r")
+        else:
+            if source["size"] % 8:
+                raise ValueError("Raw files must hold whole float64 values (size is not a multiple of 8)")
+            numbers = np.memmap(source["path"], dtype="<f8", mode="r") if source["size"] else np.empty(0)
+    except OSError as error:
+        raise ValueError(f"Could not read {os.path.basename(source['path'])}: {error}") from error
+    if numbers.ndim != 1 or numbers.dtype.kind not in "fiu":
+        raise ValueError("The file must hold a one-dimensional numeric array")
+    if len(numbers) == 0:
+        raise ValueError("The file holds no numbers")
+    # Only convert (and copy) when the file isn't float64 already.
+    return numbers if numbers.dtype == np.float64 else numbers.astype(np.float64)
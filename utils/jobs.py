@@ -0,0 +1,130 @@
+import contextvars
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+# Background jobs get their own small pool: a job may itself fan work out to
+# utils.parallel's chunk pool and wait for it, which must not happen on a
+# thread of the same pool.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+# Finished jobs whose session never came back for the result are dropped
+# after this many seconds.
+JOB_TTL = 600.0
+
+class JobCancelled(Exception):
+    """Raised inside a job, at its next progress report, once it is cancelled."""
+
+class Job:
+    """A function running on the job pool, with progress and cooperative cancellation.
+
+    The function receives the Job as its first argument and calls report()
+    between steps; cancellation takes effect at the next report().
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.progress = 0.0
+        self.message = "Queued"
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+
+    def report(self, progress: float, message: str = "") -> None:
+        """Update progress (0..1); raises JobCancelled if the job was cancelled."""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message:
+            self.message = message
+
+    def check(self) -> None:
+        """Raise JobCancelled if the job was cancelled, without changing its progress."""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def cancel(self) -> None:
+        """Ask the job to stop (and drop it from the queue if it hasn't started)."""
+        self._cancelled.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> Any:
+        """The function's return value; raises JobCancelled or the function's exception."""
+        try:
+            return self.future.result()
+        except CancelledError:
+            raise JobCancelled()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_jobs: Dict[str, Job] = {}
+_lock = threading.Lock()
+
+def _run(job: Job, function: Callable, args: tuple) -> Any:
+    try:
+        job.report(0.0, "Running")
+        return function(job, *args)
+    finally:
+        job.finished_at = time.monotonic()
+
+def _expire() -> None:
+    now = time.monotonic()
+    for job_id in [job_id for job_id, job in _jobs.items() if job.finished_at and now - job.finished_at > JOB_TTL]:
+        del _jobs[job_id]
+
+def submit_job(function: Callable, *args) -> str:
+    """Run function(job, *args) on the job pool and return the job id.
+
+    The function runs in a copy of the caller's context, so context
+    variables such as the rerun's span recorder carry over to the job.
+    """
+    global _executor
+    job = Job()
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job-worker")
+        _expire()
+        _jobs[job.id] = job
+        job.future = _executor.submit(contextvars.copy_context().run, _run, job, function, args)
+    return job.id
+
+def get_job(job_id: str) -> Optional[Job]:
+    """The job with this id, or None if it is unknown or was already collected."""
+    with _lock:
+        return _jobs.get(job_id)
+
+def cancel_job(job_id: str) -> None:
+    """Cancel and forget a job; a no-op for unknown ids."""
+    with _lock:
+        job = _jobs.pop(job_id, None)
+    if job is not None:
+        job.cancel()
+
+def wait_job(job_id: str, timeout: float) -> bool:
+    """Wait up to timeout seconds for a job to finish; returns whether it has."""
+    job = get_job(job_id)
+    if job is None:
+        return True
+    try:
+        job.future.exception(timeout=timeout)
+    except (FutureTimeout, CancelledError):
+        pass
+    return job.done()
+
+def pop_job(job_id: str) -> Optional[Job]:
+    """Remove a finished job from the registry and return it (None if unknown or still running)."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or not job.done():
+            return None
+        return _jobs.pop(job_id)
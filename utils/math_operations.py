@@ -1,41 +1,187 @@
+import io
+import math
 import numpy as np
-from typing import List, Union, Tuple
+from typing import Iterator, List, Optional, Union, Tuple
+from utils.jobs import JobCancelled
+from utils.tracing import traced
+from utils.streaming_stats import CHUNK_SIZE, LogProduct, MantissaExponent, RunningStats, iter_chunks
+from utils.parallel import (
+    should_parallelize,
+    parallel_stats,
+    parallel_product,
+    parallel_log_product,
+    parallel_cumsum
+)
 
-def validate_numbers(numbers: List[str]) -> Tuple[bool, List[float], str]:
-    """Validate and convert string inputs to numbers."""
+MAX_REPORTED_LINES = 5
+
+SEQUENCE_KINDS = ["linspace", "arange", "geometric", "random"]
+
+# Longest sequence generate_sequence accepts; it is streamed, but every
+# pass over it still takes time proportional to its length.
+MAX_SEQUENCE_LENGTH = 10**9
+
+@traced()
+def parse_numbers(text: str) -> Tuple[bool, np.ndarray, str]:
+    """Parse one number per line into a float64 array in a single pass.
+
+    Blank lines are skipped. On invalid input the offending (1-based)
+    line numbers are reported.
+    """
+    if not text.strip():
+        return False, np.empty(0), "Please enter some numbers"
     try:
-        converted = [float(num.strip()) for num in numbers if num.strip()]
-        if not converted:
-            return False, [], "Please enter some numbers"
-        return True, converted, ""
+        # ndmin=2 keeps rows apart, so "1 2 3" on one line is a 1x3 table,
+        # not three numbers, and is left for the per-line check to reject.
+        numbers = np.loadtxt(io.StringIO(text), dtype=np.float64, ndmin=2, comments=None)
+        if numbers.shape[1] == 1:
+            return True, numbers.ravel(), ""
     except ValueError:
-        return False, [], "Please enter valid numbers"
+        pass
+
+    # Slow path, only taken for input the bulk parser rejected.
+    values = []
+    bad_lines = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            try:
+                values.append(float(line))
+            except ValueError:
+                bad_lines.append(line_number)
+    if not bad_lines:
+        return True, np.array(values, dtype=np.float64), ""
+    shown = ", ".join(str(line_number) for line_number in bad_lines[:MAX_REPORTED_LINES])
+    if len(bad_lines) > MAX_REPORTED_LINES:
+        shown += f" and {len(bad_lines) - MAX_REPORTED_LINES} more"
+    return False, np.empty(0), f"Please enter valid numbers (invalid line {shown})"
+
+@traced()
+def validate_numbers(numbers: List[str]) -> Tuple[bool, np.ndarray, str]:
+    """Validate and convert string inputs to numbers."""
+    return parse_numbers("\n".join(numbers))
+
+@traced()
+def perform_operation(numbers: List[float], operation: str) -> Tuple[bool, Union[float, np.ndarray, MantissaExponent], str]:
+    """Perform mathematical operations on the input numbers.
 
-def perform_operation(numbers: List[float], operation: str) -> Tuple[bool, Union[float, List[float]], str]:
-    """Perform mathematical operations on the input numbers."""
+    "Product (log-space)" returns a MantissaExponent and never overflows;
+    Cumulative Sum returns a read-only float64 array.
+    The reductions also accept an iterable of NumPy blocks (such as a
+    GeneratedSequence), which is consumed chunk by chunk without being
+    materialized; Cumulative Sum needs an array or list.
+    """
     try:
-        if not numbers:
+        if hasattr(numbers, "__len__") and len(numbers) == 0:
             return False, 0, "No numbers provided"
             
-        if operation == "Sum":
-            return True, sum(numbers), ""
-        elif operation == "Average":
-            return True, np.mean(numbers), ""
+        # Large arrays are split across the worker pool and the partial
+        # results combined; everything else runs serially.
+        parallel = isinstance(numbers, np.ndarray) and should_parallelize(len(numbers))
+
+        if operation in ("Sum", "Average", "Standard Deviation"):
+            if parallel:
+                stats = parallel_stats(numbers)
+            else:
+                stats = RunningStats.from_chunks(iter_chunks(numbers))
+            if operation == "Sum":
+                return True, stats.total, ""
+            elif operation == "Average":
+                return True, stats.mean, ""
+            return True, stats.std, ""
         elif operation == "Product":
+            if parallel:
+                return True, parallel_product(numbers), ""
+            if not isinstance(numbers, (np.ndarray, list, tuple)):
+                return True, np.prod([np.prod(block) for block in iter_chunks(numbers)]), ""
             return True, np.prod(numbers), ""
-        elif operation == "Standard Deviation":
-            return True, np.std(numbers), ""
+        elif operation == "Product (log-space)":
+            if parallel:
+                return True, parallel_log_product(numbers).result(), ""
+            return True, LogProduct.from_chunks(iter_chunks(numbers)).result(), ""
         elif operation == "Cumulative Sum":
-            return True, np.cumsum(numbers).tolist(), ""
+            if not isinstance(numbers, (np.ndarray, list, tuple)):
+                return False, 0, "Cumulative Sum needs every value in memory; use text or file input"
+            totals = parallel_cumsum(numbers) if parallel else np.cumsum(numbers, dtype=np.float64)
+            totals.flags.writeable = False  # cached and shared between sessions
+            return True, totals, ""
         else:
             return False, 0, f"Unknown operation: {operation}"
             
+    except JobCancelled:
+        raise  # not an error in the input, so it mustn't be cached as a result
     except Exception as e:
         return False, 0, f"Error in calculation: {str(e)}"
 
-def generate_sequence(start: float, end: float, steps: int) -> List[float]:
-    """Generate a sequence of numbers."""
-    try:
-        return list(np.linspace(start, end, steps))
-    except Exception:
-        return []
+class GeneratedSequence:
+    """A lazily generated sequence of float64 values.
+
+    len() is known up front and every iteration yields blocks of at most
+    chunk_size values, computed from their indices, so the sequence can be
+    read several times (statistics, then the chart) without ever being
+    materialized. Random sequences are seeded, so each pass is identical.
+    """
+
+    def __init__(self, kind: str, start: float, end: float, steps: int, step: float = 1.0,
+                 seed: Optional[int] = None, chunk_size: int = CHUNK_SIZE):
+        if kind not in SEQUENCE_KINDS:
+            raise ValueError(f"Unknown sequence kind: {kind}")
+        if kind == "arange":
+            if step == 0:
+                raise ValueError("The step must not be zero")
+            count = (end - start) / step
+            steps = MAX_SEQUENCE_LENGTH + 1 if count > MAX_SEQUENCE_LENGTH else max(0, math.ceil(count))
+        if kind == "geometric" and (start == 0 or end == 0 or (start < 0) != (end < 0)):
+            raise ValueError("A geometric sequence needs a non-zero start and end of the same sign")
+        if steps < 1:
+            raise ValueError("The sequence would be empty")
+        if steps > MAX_SEQUENCE_LENGTH:
+            raise ValueError(f"The sequence would have more than {MAX_SEQUENCE_LENGTH:,} values")
+        if kind == "random" and seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2**32)
+        self.kind = kind
+        self.start = float(start)
+        self.end = float(end)
+        self.steps = int(steps)
+        self.step = float(step)
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self.steps
+
+    def __repr__(self) -> str:
+        return (f"GeneratedSequence({self.kind!r}, {self.start!r}, {self.end!r}, {self.steps!r}, "
+                f"step={self.step!r}, seed={self.seed!r})")
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        rng = np.random.default_rng(self.seed) if self.kind == "random" else None
+        last = self.steps - 1
+        for first in range(0, self.steps, self.chunk_size):
+            stop = min(first + self.chunk_size, self.steps)
+            if rng is not None:
+                yield rng.uniform(self.start, self.end, stop - first)
+                continue
+            index = np.arange(first, stop, dtype=np.float64)
+            if self.kind == "arange":
+                yield self.start + index * self.step
+            elif self.kind == "linspace":
+                block = self.start + index * ((self.end - self.start) / last if last else 0.0)
+                if stop == self.steps and last:
+                    block[-1] = self.end  # exact endpoint, like np.linspace
+                yield block
+            else:  # geometric, interpolated in log space like np.geomspace
+                sign = -1.0 if self.start < 0 else 1.0
+                log_start, log_end = math.log(abs(self.start)), math.log(abs(self.end))
+                block = sign * np.exp(log_start + index * ((log_end - log_start) / last if last else 0.0))
+                if first == 0:
+                    block[0] = self.start
+                if stop == self.steps and last:
+                    block[-1] = self.end
+                yield block
+
+def generate_sequence(start: float, end: float, steps: int, kind: str = "linspace", step: float = 1.0,
+                      seed: Optional[int] = None) -> GeneratedSequence:
+    """Lazily generate a sequence: linspace/geometric (steps values from start to end),
+    arange (start to end, exclusive, by step) or seeded uniform random (steps values in [start, end)).
+    """
+    return GeneratedSequence(kind, start, end, steps, step=step, seed=seed)
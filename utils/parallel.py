@@ -0,0 +1,95 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
+from utils.streaming_stats import LogProduct, RunningStats, iter_chunks
+
+# Inputs at least this long run on the thread pool; smaller ones stay serial,
+# where thread start-up and result combination would cost more than they save.
+PARALLEL_THRESHOLD = 4_000_000
+
+WORKERS = os.cpu_count() or 1
+
+ELEMENTWISE_UFUNCS = {
+    "Add": np.add,
+    "Subtract": np.subtract,
+    "Multiply": np.multiply,
+    "Divide": np.divide,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool, created on first use.
+
+    Threads share the input array's memory directly, and NumPy releases the
+    GIL inside reductions and ufunc loops, so the chunks run concurrently.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="chunk-worker")
+        return _executor
+
+def should_parallelize(size: int) -> bool:
+    """Whether an input of this many elements should use the parallel path."""
+    return WORKERS > 1 and size >= PARALLEL_THRESHOLD
+
+def split_ranges(size: int, parts: int = WORKERS) -> List[Tuple[int, int]]:
+    """Split range(size) into at most `parts` contiguous (start, stop) ranges."""
+    edges = np.linspace(0, size, min(parts, max(size, 1)) + 1).astype(np.int64)
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+def _map(function, ranges: List[Tuple[int, int]]) -> list:
+    return list(get_executor().map(lambda bounds: function(*bounds), ranges))
+
+def parallel_stats(array: np.ndarray) -> RunningStats:
+    """Sum/mean/variance/min/max of an array from per-chunk partial states."""
+    partials = _map(
+        lambda start, stop: RunningStats.from_chunks(iter_chunks(array[start:stop])), split_ranges(len(array))
+    )
+    stats = RunningStats()
+    for partial in partials:
+        stats.merge(partial)
+    return stats
+
+def parallel_product(array: np.ndarray) -> float:
+    """Product of an array from per-chunk partial products."""
+    partials = _map(lambda start, stop: np.prod(array[start:stop]), split_ranges(len(array)))
+    return np.prod(partials)
+
+def parallel_log_product(array: np.ndarray) -> LogProduct:
+    """Log-space product of an array from per-chunk partial products."""
+    partials = _map(
+        lambda start, stop: LogProduct.from_chunks(iter_chunks(array[start:stop])), split_ranges(len(array))
+    )
+    product = LogProduct()
+    for partial in partials:
+        product.merge(partial)
+    return product
+
+def parallel_cumsum(array: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Cumulative sum: per-chunk cumsums, then each chunk is offset by the carry of the chunks before it."""
+    if out is None:
+        out = np.empty(len(array), dtype=np.result_type(array, np.float64))
+    ranges = split_ranges(len(array))
+    _map(lambda start, stop: np.cumsum(array[start:stop], out=out[start:stop]), ranges)
+    carries = np.cumsum([out[stop - 1] for _, stop in ranges[:-1]])
+
+    def add_carry(index: int) -> None:
+        start, stop = ranges[index + 1]
+        out[start:stop] += carries[index]
+
+    list(get_executor().map(add_carry, range(len(carries))))
+    return out
+
+def parallel_elementwise(array: np.ndarray, operation: str, value: float,
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply Add/Subtract/Multiply/Divide by a scalar chunk by chunk into `out`."""
+    ufunc = ELEMENTWISE_UFUNCS[operation]
+    if out is None:
+        out = np.empty(len(array), dtype=np.result_type(array, value, np.float64))
+    _map(lambda start, stop: ufunc(array[start:stop], value, out=out[start:stop]), split_ranges(len(array)))
+    return out
@@ -0,0 +1,295 @@
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+import numpy as np
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple, Union
+
+# Elements per chunk; small enough for a chunk and its temporaries to stay in cache.
+CHUNK_SIZE = 1 << 16
+
+# Called by iter_chunks before each block in the current context, e.g. so a
+# background job can be cancelled in the middle of a long stream.
+_block_check: ContextVar[Optional[Callable[[], None]]] = ContextVar("block_check", default=None)
+
+@contextmanager
+def checking_blocks(check: Callable[[], None]) -> Iterator[None]:
+    """Call check() before every block iter_chunks yields in this context; it may raise to stop."""
+    token = _block_check.set(check)
+    try:
+        yield
+    finally:
+        _block_check.reset(token)
+
+def iter_chunks(data: Union[np.ndarray, Sequence[float], Iterable[np.ndarray]],
+                chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Yield float64 blocks from an array/list (as views) or pass through an iterable of blocks."""
+    check = _block_check.get()
+    if isinstance(data, np.ndarray) or (isinstance(data, Sequence) and not isinstance(data, (str, bytes))):
+        array = np.asarray(data, dtype=np.float64).ravel()
+        for start in range(0, len(array), chunk_size):
+            if check is not None:
+                check()
+            yield array[start:start + chunk_size]
+    else:
+        for block in data:
+            if check is not None:
+                check()
+            yield np.asarray(block, dtype=np.float64).ravel()
+
+def iter_file_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Yield float64 blocks from a .npy file (memory-mapped) or a one-number-per-line text file."""
+    if path.endswith(".npy"):
+        yield from iter_chunks(np.load(path, mmap_mode="r"), chunk_size)
+        return
+    import pandas as pd
+    for frame in pd.read_csv(path, header=None, usecols=[0], chunksize=chunk_size, dtype=np.float64):
+        yield frame[0].to_numpy()
+
+class RunningStats:
+    """Mergeable count, sum, mean, variance (Welford/Chan), min and max.
+
+    Each update() folds a whole block in with vectorized reductions, and
+    merge() combines partial states computed on different blocks or
+    threads with Chan's parallel formula.
+    """
+
+    __slots__ = ("count", "total", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    @classmethod
+    def from_block(cls, block: np.ndarray) -> "RunningStats":
+        """Partial state for a single block."""
+        stats = cls()
+        if len(block):
+            stats.count = len(block)
+            stats.total = float(block.sum())
+            stats.mean = stats.total / stats.count
+            deviations = block - stats.mean
+            stats.m2 = float(np.dot(deviations, deviations))
+            stats.minimum = float(block.min())
+            stats.maximum = float(block.max())
+        return stats
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[np.ndarray]) -> "RunningStats":
+        """Accumulate an iterable of blocks."""
+        stats = cls()
+        for block in chunks:
+            stats.merge(cls.from_block(block))
+        return stats
+
+    def update(self, block: np.ndarray) -> "RunningStats":
+        """Fold a block of values into the state."""
+        return self.merge(RunningStats.from_block(np.asarray(block, dtype=np.float64).ravel()))
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Combine another partial state into this one (Chan et al.)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            for slot in self.__slots__:
+                setattr(self, slot, getattr(other, slot))
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.total += other.total
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Population variance (ddof=0, like np.var)."""
+        return self.m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (ddof=0, like np.std)."""
+        return math.sqrt(self.variance)
+
+class MantissaExponent(NamedTuple):
+    """A number too large or small for float64, as mantissa * 10**exponent."""
+    mantissa: float
+    exponent: int
+
+    def __str__(self) -> str:
+        if not math.isfinite(self.mantissa) or self.exponent == 0:
+            return f"{self.mantissa:.6f}"
+        return f"{self.mantissa:.6f}e{self.exponent:+d}"
+
+class LogProduct:
+    """Overflow-safe, mergeable product accumulated in log space.
+
+    Each value is split with frexp into a mantissa and an exact integer
+    power of two; the integer exponents and the log2 of the mantissas are
+    summed separately, the sign is tracked as the parity of negative
+    values, and zeros are counted instead of collapsing the product.
+    """
+
+    __slots__ = ("count", "zeros", "nans", "negative", "exponent2", "log2_mantissa")
+
+    def __init__(self):
+        self.count = 0
+        self.zeros = 0
+        self.nans = 0
+        self.negative = False
+        self.exponent2 = 0
+        self.log2_mantissa = 0.0
+
+    @classmethod
+    def from_block(cls, block: np.ndarray) -> "LogProduct":
+        """Partial state for a single block."""
+        product = cls()
+        product.count = len(block)
+        product.nans = int(np.count_nonzero(np.isnan(block)))
+        nonzero = block[block != 0]
+        product.zeros = len(block) - len(nonzero)
+        product.negative = bool(np.count_nonzero(nonzero < 0) % 2)
+        mantissas, exponents = np.frexp(np.abs(nonzero))
+        product.exponent2 = int(exponents.sum(dtype=np.int64))
+        product.log2_mantissa = float(np.log2(mantissas).sum())
+        return product
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[np.ndarray]) -> "LogProduct":
+        """Accumulate an iterable of blocks without materializing them."""
+        product = cls()
+        for block in chunks:
+            product.merge(cls.from_block(block))
+        return product
+
+    def merge(self, other: "LogProduct") -> "LogProduct":
+        """Combine another partial product into this one."""
+        self.count += other.count
+        self.zeros += other.zeros
+        self.nans += other.nans
+        self.negative ^= other.negative
+        self.exponent2 += other.exponent2
+        self.log2_mantissa += other.log2_mantissa
+        return self
+
+    @property
+    def log10_abs(self) -> float:
+        """log10 of the absolute product (-inf if any value is zero)."""
+        if self.zeros:
+            return -math.inf
+        return (self.exponent2 + self.log2_mantissa) * math.log10(2)
+
+    def result(self) -> MantissaExponent:
+        """The product as mantissa * 10**exponent with 1 <= |mantissa| < 10."""
+        if self.nans:
+            return MantissaExponent(math.nan, 0)
+        if self.zeros or self.count == 0:
+            return MantissaExponent(0.0 if self.count else 1.0, 0)
+        log10_abs = self.log10_abs
+        if math.isinf(log10_abs):
+            return MantissaExponent(-math.inf if self.negative else math.inf, 0)
+        exponent = math.floor(log10_abs)
+        mantissa = 10 ** (log10_abs - exponent)
+        if mantissa >= 10:  # rounding at the top of the decade
+            mantissa, exponent = mantissa / 10, exponent + 1
+        return MantissaExponent(-mantissa if self.negative else mantissa, exponent)
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch.
+
+    Level h holds items of weight 2**h. When a level exceeds its capacity
+    it is sorted and every other item (random offset) is promoted, so the
+    sketch keeps O(k log(n/k)) items. Until the first compaction it holds
+    every value and answers exactly.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so total weight is preserved.
+                leftover, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                level = 0  # capacities shift when a level is added
+                continue
+            level += 1
+
+    def update(self, block: np.ndarray) -> "KLLSketch":
+        """Add a block of values."""
+        block = np.asarray(block, dtype=np.float64).ravel()
+        self.levels[0] = np.concatenate([self.levels[0], block])
+        self.count += len(block)
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Combine another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.k = min(self.k, other.k)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (exact, with linear interpolation, before any compaction)."""
+        if self.count == 0:
+            return math.nan
+        if len(self.levels) == 1:
+            return float(np.quantile(self.levels[0], q))
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2.0 ** level) for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(items[order][min(index, len(items) - 1)])
+
+def summarize(data: Union[np.ndarray, Sequence[float], Iterable[np.ndarray]],
+              k: int = 200) -> Tuple[RunningStats, KLLSketch]:
+    """One pass over the data's blocks, returning the moment state and a quantile sketch."""
+    stats = RunningStats()
+    sketch = KLLSketch(k)
+    for block in iter_chunks(data):
+        stats.merge(RunningStats.from_block(block))
+        sketch.update(block)
+    return stats, sketch
+
+def describe(data: Union[np.ndarray, Sequence[float], Iterable[np.ndarray]],
+             percentiles: Sequence[float] = (25, 50, 75)) -> Dict[str, float]:
+    """Count, sum, mean, std, min, max and percentiles of the data in one pass."""
+    stats, sketch = summarize(data)
+    summary = {
+        'Count': stats.count,
+        'Sum': stats.total,
+        'Mean': stats.mean if stats.count else math.nan,
+        'Standard Deviation': stats.std,
+        'Minimum': stats.minimum,
+        'Maximum': stats.maximum,
+    }
+    for percentile in percentiles:
+        summary[f'P{percentile:g}'] = sketch.quantile(percentile / 100)
+    return summary
@@ -0,0 +1,198 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+# Recording is per rerun and only happens while a Recorder is active in the
+# current context; otherwise span() and @traced cost one ContextVar lookup.
+# The debug panel turns it on with ?debug=1, or TRACE_SPANS=1 turns it on
+# for every session.
+ENABLED_BY_DEFAULT = os.environ.get("TRACE_SPANS") == "1"
+
+# Reruns kept per session for the panel and the trace export.
+HISTORY_LENGTH = 20
+
+_recorder: ContextVar[Optional["Recorder"]] = ContextVar("recorder", default=None)
+_disabled = nullcontext()
+
+# tracemalloc is process-wide, so it runs while any recorder counts traced
+# bytes, and is only stopped if this module started it.
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+_tracemalloc_lock = threading.Lock()
+
+class Span(NamedTuple):
+    name: str
+    start_ns: int
+    duration_ns: int
+    depth: int
+    thread: int
+    blocks: int  # net change in allocated memory blocks (sys.getallocatedblocks)
+    bytes: Optional[int]  # net traced bytes, only while tracemalloc is tracing
+
+class Recorder:
+    """Spans recorded during one script rerun, and by the background jobs it started."""
+
+    def __init__(self, name: str, trace_allocations: bool = False):
+        self.name = name
+        self.trace_allocations = trace_allocations
+        self.thread = threading.get_ident()
+        self.started_ns = time.perf_counter_ns()
+        self.finished_ns: Optional[int] = None
+        self.spans: List[Span] = []
+        self._depths: Dict[int, int] = {}  # nesting per thread, since jobs record from their own
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the block and count the memory blocks it allocated."""
+        thread = threading.get_ident()
+        depth = self._depths.get(thread, 0)
+        self._depths[thread] = depth + 1
+        traced_before = tracemalloc.get_traced_memory()[0] if self.trace_allocations else None
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            blocks = sys.getallocatedblocks() - blocks_before
+            traced = tracemalloc.get_traced_memory()[0] - traced_before if self.trace_allocations else None
+            self._depths[thread] = depth
+            self.spans.append(Span(name, start, duration, depth, thread, blocks, traced))
+
+    def total_ms(self) -> float:
+        """Wall time of the rerun (so far, if it is still being recorded)."""
+        return ((self.finished_ns or time.perf_counter_ns()) - self.started_ns) / 1e6
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Spans in start order, indented by nesting, for display as a table."""
+        return [
+            {
+                "span": "  " * span.depth + span.name,
+                "ms": round(span.duration_ns / 1e6, 3),
+                "blocks": span.blocks,
+                **({"bytes": span.bytes} if self.trace_allocations else {}),
+            }
+            for span in sorted(self.spans, key=lambda span: span.start_ns)
+        ]
+
+def span(name: str):
+    """Context manager recording a span in the current rerun, if one is being recorded."""
+    recorder = _recorder.get()
+    return _disabled if recorder is None else recorder.span(name)
+
+def traced(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator recording each call of the function as a span."""
+    def decorate(function: Callable) -> Callable:
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return function(*args, **kwargs)
+            with recorder.span(label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def start_recording(name: str, trace_allocations: bool = False) -> Recorder:
+    """Record spans for the rest of this rerun in the current context."""
+    stop_recording()  # a recorder still active in this context is replaced
+    recorder = Recorder(name, trace_allocations)
+    if trace_allocations:
+        _acquire_tracemalloc()
+    _recorder.set(recorder)
+    return recorder
+
+def stop_recording() -> Optional[Recorder]:
+    """Stop recording and return the rerun's recorder (None if none was active)."""
+    recorder = _recorder.get()
+    _recorder.set(None)
+    if recorder is not None and recorder.finished_ns is None:
+        recorder.finished_ns = time.perf_counter_ns()
+        if recorder.trace_allocations:
+            _release_tracemalloc()
+    return recorder
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+def chrome_trace(recorders: Iterable[Recorder]) -> Dict[str, Any]:
+    """Reruns as Chrome trace-event JSON (complete "X" events, in microseconds)."""
+    events = []
+    for index, recorder in enumerate(recorders):
+        events.append({
+            "name": f"rerun {index + 1}", "cat": recorder.name, "ph": "X", "pid": 1, "tid": recorder.thread,
+            "ts": recorder.started_ns / 1000, "dur": recorder.total_ms() * 1000,
+        })
+        for span in recorder.spans:
+            args = {"blocks": span.blocks}
+            if span.bytes is not None:
+                args["bytes"] = span.bytes
+            events.append({
+                "name": span.name, "cat": recorder.name, "ph": "X", "pid": 1, "tid": span.thread,
+                "ts": span.start_ns / 1000, "dur": span.duration_ns / 1000, "args": args,
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+@contextmanager
+def begin_rerun(script: str) -> Iterator[Optional[Recorder]]:
+    """Record the rerun run inside the block if the debug panel is on for the session.
+
+    Wrap the whole script body: recording stops when the block exits, however
+    the rerun ends (an exception, st.stop() or a rerun request), so a
+    recorder counting traced bytes always releases tracemalloc. Each rerun
+    starts in a fresh context, so nothing later would release it otherwise.
+    """
+    import streamlit as st
+    enabled = ENABLED_BY_DEFAULT or st.query_params.get("debug") == "1"
+    if not enabled:
+        yield None
+        return
+    recorder = start_recording(script, trace_allocations=st.session_state.get("trace_allocations", False))
+    try:
+        yield recorder
+    finally:
+        if _recorder.get() is recorder:
+            stop_recording()
+
+def render_debug_panel(recorder: Optional[Recorder]) -> None:
+    """Sidebar panel with this rerun's spans and a trace download of the recent reruns."""
+    if recorder is None:
+        return
+    import streamlit as st
+    stop_recording()
+    history = st.session_state.setdefault("trace_history", [])
+    history.append(recorder)
+    del history[:-HISTORY_LENGTH]
+    with st.sidebar.expander("Profiling", expanded=True):
+        st.checkbox("Count traced bytes (tracemalloc, slower)", key="trace_allocations")
+        st.caption(f"This rerun: {recorder.total_ms():.1f} ms, {len(recorder.spans)} spans")
+        st.dataframe(recorder.rows(), hide_index=True, use_container_width=True)
+        st.download_button(
+            f"Download trace ({len(history)} reruns)",
+            json.dumps(chrome_trace(history)),
+            file_name="trace.json",
+            mime="application/json",
+            help="Open in chrome://tracing or https://ui.perfetto.dev",
+        )